@@ -1,7 +1,19 @@
+import atexit
+import csv
+import datetime
+import decimal
+import importlib.util
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import tkinter as tk
-from tkinter import messagebox, StringVar
+from tkinter import messagebox, StringVar, filedialog
 from ttkbootstrap import Style
-from ttkbootstrap.widgets import Frame, Entry, Button, Label, Treeview, Combobox, Scrollbar
+from ttkbootstrap.widgets import Frame, Entry, Button, Label, Treeview, Combobox, Scrollbar, Progressbar
 import pyodbc
 
 # --- Database Configuration ---
@@ -11,47 +23,373 @@ DB_CONFIG = {
     'trusted_connection': 'yes',
 }
 
+# --- Connection Pool ---
+POOL_SIZE = 4           # most connections open at once
+POOL_TIMEOUT = 30       # seconds to wait for a free connection
+POOL_PING_AFTER = 60    # idle seconds after which a connection is checked before reuse
+
 changes_buffer = []
 
-# --- Execute SQL Queries ---
-def execute_query(query, params=None, fetch=False):
+def get_connection():
+    return pyodbc.connect(
+        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
+        f'SERVER={DB_CONFIG["server"]};'
+        f'DATABASE={DB_CONFIG["database"]};'
+        f'Trusted_Connection={DB_CONFIG["trusted_connection"]};'
+    )
+
+def is_disconnect(err):
+    # SQLSTATE class 08 = connection exception (dropped link, server restart, killed session)
+    return bool(err.args) and str(err.args[0]).startswith("08")
+
+def close_quietly(conn):
     try:
-        conn = pyodbc.connect(
-            f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-            f'SERVER={DB_CONFIG["server"]};'
-            f'DATABASE={DB_CONFIG["database"]};'
-            'Trusted_Connection=yes;'
-        )
-        cursor = conn.cursor()
-        cursor.execute(query, params or [])
-        if fetch:
-            result = cursor.fetchall()
-            conn.close()
-            return result
-        conn.commit()
         conn.close()
-    except pyodbc.Error as err:
+    except pyodbc.Error:
+        pass
+
+class ConnectionPool:
+    """Bounded pool of reusable connections; long-idle ones are pinged before being handed out."""
+
+    def __init__(self, connect, size=POOL_SIZE, timeout=POOL_TIMEOUT, ping_after=POOL_PING_AFTER):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.idle = []          # (conn, released_at), most recently used last
+        self.open_count = 0
+        self.closed = False
+        self.lock = threading.Condition()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self.lock:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self.idle:
+                    conn, released_at = self.idle.pop()
+                    break
+                if self.open_count < self.size:
+                    self.open_count += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.lock.wait(remaining):
+                    raise TimeoutError(f"No free database connection after {self.timeout}s")
+
+        if conn is not None and time.monotonic() - released_at > self.ping_after and not self.healthy(conn):
+            close_quietly(conn)
+            conn = None
+        if conn is None:
+            try:
+                conn = self.connect()
+            except Exception:
+                self.forget()
+                raise
+        return conn
+
+    def release(self, conn, broken=False):
+        if broken:
+            # A dropped connection usually means the server or network went away, so the idle
+            # ones opened before it are stale too; a retry must not be handed one of them
+            close_quietly(conn)
+            self.discard_idle()
+            self.forget()
+            return
+        with self.lock:
+            if self.closed:
+                close_quietly(conn)
+                self.open_count -= 1
+            else:
+                self.idle.append((conn, time.monotonic()))
+            self.lock.notify()
+
+    def forget(self):
+        # The slot of a connection that failed or dropped becomes free again
+        with self.lock:
+            self.open_count -= 1
+            self.lock.notify()
+
+    @staticmethod
+    def healthy(conn):
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @contextmanager
+    def connection(self):
+        # Rolls back whatever the caller left uncommitted on error; dropped connections are discarded
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except BaseException as err:
+            broken = isinstance(err, pyodbc.Error) and is_disconnect(err)
+            if not broken:
+                try:
+                    conn.rollback()
+                except pyodbc.Error:
+                    broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def discard_idle(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+            self.open_count -= len(idle)
+            self.lock.notify_all()
+        for conn, _ in idle:
+            close_quietly(conn)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+        self.discard_idle()
+
+db_pool = ConnectionPool(get_connection)
+atexit.register(db_pool.close)
+
+# --- Execute SQL Queries ---
+def run_query(query, params=None, fetch=False, job=None):
+    # A statement that hit a dropped connection never committed, so it is retried once on a fresh one
+    for attempt in (1, 2):
+        try:
+            with db_pool.connection() as conn:
+                cursor = conn.cursor()
+                if job:
+                    job.attach(cursor)
+                cursor.execute(query, params or [])
+                result = cursor.fetchall() if fetch else None
+                conn.commit()
+                return result
+        except pyodbc.Error as err:
+            if job and job.cancelled.is_set():
+                raise QueryCancelled(job.description) from err
+            if attempt == 2 or not is_disconnect(err):
+                raise
+        finally:
+            if job:
+                job.cursor = None
+
+# --- Background Queries ---
+POLL_MS = 50   # how often the Tk loop picks up finished queries
+
+class QueryCancelled(Exception):
+    pass
+
+class Job:
+    """One piece of background work; cancelling it also cancels the statement running on its cursor."""
+
+    def __init__(self, description):
+        self.description = description
+        self.started = time.monotonic()
+        self.cancelled = threading.Event()
+        self.cursor = None
+
+    def attach(self, cursor):
+        if self.cancelled.is_set():
+            raise QueryCancelled(self.description)
+        self.cursor = cursor
+
+    def cancel(self):
+        self.cancelled.set()
+        cursor = self.cursor
+        if cursor is not None:
+            try:
+                cursor.cancel()
+            except pyodbc.Error:
+                pass
+
+class QueryRunner:
+    """Runs database work on worker threads and hands the results to Tk callbacks via a polled queue.
+
+    Work is submitted on a channel; a newer submission (or invalidate) on the same
+    channel makes older results stale, and stale results are dropped unseen.
+    """
+
+    def __init__(self, root, status_label, progress, cancel_button, workers=POOL_SIZE):
+        self.root = root
+        self.status_label = status_label
+        self.progress = progress
+        self.cancel_button = cancel_button
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="curd-query")
+        self.results = queue.Queue()
+        self.tokens = itertools.count(1)
+        self.latest = {}       # channel -> token of the newest submission
+        self.active = {}       # token -> Job still running
+        self.busy = False
+        self.root.after(POLL_MS, self.poll)
+
+    def submit(self, channel, work, on_done, on_error=None, description="Working"):
+        token = self.latest[channel] = next(self.tokens)
+        job = self.active[token] = Job(description)
+        self.executor.submit(self.run, token, channel, job, work, on_done, on_error or report_error)
+        return job
+
+    def run(self, token, channel, job, work, on_done, on_error):
+        try:
+            result, error = work(job), None
+        except Exception as err:
+            result, error = None, err
+        if job.cancelled.is_set() and error is not None:
+            error = QueryCancelled(job.description)
+        self.results.put((token, channel, result, error, on_done, on_error))
+
+    def invalidate(self, channel):
+        self.latest[channel] = next(self.tokens)
+
+    def running(self, channel):
+        return self.latest.get(channel) in self.active
+
+    def cancel_all(self):
+        for job in list(self.active.values()):
+            job.cancel()
+
+    def poll(self):
+        while True:
+            try:
+                token, channel, result, error, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.active.pop(token, None)
+            if self.latest.get(channel) != token:
+                continue
+            if error is None:
+                on_done(result)
+            else:
+                on_error(error)
+        self.show_progress()
+        self.root.after(POLL_MS, self.poll)
+
+    def show_progress(self):
+        if self.active:
+            job = min(self.active.values(), key=lambda j: j.started)
+            more = f" (+{len(self.active) - 1} more)" if len(self.active) > 1 else ""
+            self.status_label.config(text=f"{job.description}… {time.monotonic() - job.started:.1f}s{more}")
+            if not self.busy:
+                self.progress.start(10)
+                self.cancel_button.config(state=tk.NORMAL)
+                self.busy = True
+        elif self.busy:
+            self.progress.stop()
+            self.status_label.config(text="")
+            self.cancel_button.config(state=tk.DISABLED)
+            self.busy = False
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
+
+def report_error(err):
+    if not isinstance(err, QueryCancelled):
         messagebox.showerror("SQL Error", str(err))
 
-# --- Load Table Columns ---
-def load_table_columns(table_name):
-    cols = execute_query("SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ?", (table_name,), fetch=True)
-    return [col[0] for col in cols]
+# --- Schema Cache ---
+SCHEMA_CHECK_INTERVAL = 30   # seconds a cached schema is trusted before modify_date is re-checked
+
+schema_cache = {}
+
+class TableSchema:
+    """Columns, SQL types, nullability, primary key and indexed columns of one table, as of its modify_date."""
+
+    def __init__(self, name, columns, types, nullable, primary_key, modify_date, indexed=frozenset(),
+                 identity=frozenset(), defaults=frozenset()):
+        self.name = name
+        self.columns = columns
+        self.types = types
+        self.nullable = nullable
+        self.primary_key = primary_key
+        self.modify_date = modify_date
+        self.indexed = indexed      # columns that lead at least one index, so filters on them can seek
+        self.identity = identity
+        self.defaults = defaults    # columns with a DEFAULT constraint
+        self.checked_at = time.monotonic()
+
+    @property
+    def key_columns(self):
+        # Tables without a primary key keep the old behaviour of keying on the first column
+        return self.primary_key or self.columns[:1]
+
+    @property
+    def generated_keys(self):
+        # Key columns the server fills in when left empty. A default only counts on a real
+        # primary key; on the first-column fallback it need not be unique
+        return self.identity | (self.defaults if self.primary_key else frozenset())
+
+def format_sql_type(type_name, max_length, precision, scale):
+    if type_name in ("varchar", "char", "varbinary", "binary", "nvarchar", "nchar"):
+        if max_length == -1:
+            return f"{type_name}(max)"
+        return f"{type_name}({max_length // 2 if type_name.startswith('n') else max_length})"
+    if type_name in ("decimal", "numeric"):
+        return f"{type_name}({precision},{scale})"
+    return type_name
+
+def fetch_schema(table_name, job=None):
+    rows = run_query("""
+        SELECT c.name, TYPE_NAME(c.user_type_id), c.max_length, c.precision, c.scale,
+               c.is_nullable, t.modify_date, ic.key_ordinal,
+               CASE WHEN EXISTS (SELECT 1 FROM sys.index_columns x
+                                 WHERE x.object_id = c.object_id AND x.column_id = c.column_id
+                                   AND x.key_ordinal = 1) THEN 1 ELSE 0 END,
+               c.is_identity, CASE WHEN c.default_object_id <> 0 THEN 1 ELSE 0 END
+        FROM sys.tables t
+        JOIN sys.columns c ON c.object_id = t.object_id
+        LEFT JOIN sys.indexes i ON i.object_id = t.object_id AND i.is_primary_key = 1
+        LEFT JOIN sys.index_columns ic
+               ON ic.object_id = i.object_id AND ic.index_id = i.index_id AND ic.column_id = c.column_id
+        WHERE t.name = ?
+        ORDER BY c.column_id
+    """, (table_name,), fetch=True, job=job)
+    if not rows:
+        raise LookupError(f"Table '{table_name}' does not exist")
+    columns = [row[0] for row in rows]
+    types = {row[0]: format_sql_type(*row[1:5]) for row in rows}
+    nullable = {row[0]: bool(row[5]) for row in rows}
+    primary_key = [row[0] for row in sorted((r for r in rows if r[7]), key=lambda r: r[7])]
+    indexed = frozenset(row[0] for row in rows if row[8])
+    identity = frozenset(row[0] for row in rows if row[9])
+    defaults = frozenset(row[0] for row in rows if row[10])
+    return TableSchema(table_name, columns, types, nullable, primary_key, rows[0][6], indexed, identity,
+                       defaults)
+
+def table_schema(table_name, refresh=False, revalidate=False, job=None):
+    # Served from cache; modify_date is re-checked every SCHEMA_CHECK_INTERVAL or when revalidate is set
+    cached = schema_cache.get(table_name)
+    if cached and not refresh:
+        if not revalidate and time.monotonic() - cached.checked_at < SCHEMA_CHECK_INTERVAL:
+            return cached
+        modified = run_query("SELECT modify_date FROM sys.tables WHERE name = ?", (table_name,), fetch=True, job=job)
+        if modified and modified[0][0] == cached.modify_date:
+            cached.checked_at = time.monotonic()
+            return cached
+    schema = schema_cache[table_name] = fetch_schema(table_name, job)
+    return schema
+
+def invalidate_schema(table_name=None):
+    if table_name is None:
+        schema_cache.clear()
+    else:
+        schema_cache.pop(table_name, None)
 
 # --- Entry Fields Section ---
-def add_entry_fields():
-    global entry_vars
+entry_table = None   # table the entry fields were built for
+edit_buttons = []    # disabled while a table load is in flight
+
+def add_entry_fields(schema):
+    # Built from the schema the table load fetched, so no query runs on the Tk thread
+    global entry_vars, entry_table, edit_buttons
     for widget in entry_frame.winfo_children():
         widget.destroy()
 
-    table = selected_table.get()
-    if not table:
-        return
-
-    columns = load_table_columns(table)
+    entry_table = schema.name
     entry_vars = {}
 
-    for i, col in enumerate(columns):
+    for i, col in enumerate(schema.columns):
         Label(entry_frame, text=col, font=("Times New Roman", 11, "bold")).grid(row=0, column=i, padx=10, pady=5)
         var = StringVar()
         entry_vars[col] = var
@@ -59,95 +397,923 @@ def add_entry_fields():
 
     # Buttons
     btn_kwargs = {"bootstyle": "success-outline", "width": 18, "padding": 10}
-    Button(entry_frame, text="➕ Add", command=add_record, **btn_kwargs).grid(row=2, column=0, pady=15)
-    Button(entry_frame, text="✏️ Update", command=update_record, **btn_kwargs).grid(row=2, column=1, pady=15)
-    Button(entry_frame, text="🗑️ Delete", command=delete_record, **btn_kwargs).grid(row=2, column=2, pady=15)
-    Button(entry_frame, text="💾 Save to Database", command=save_changes, bootstyle="primary-outline", width=20, padding=10).grid(row=2, column=3, pady=15)
+    edit_buttons = [
+        Button(entry_frame, text="➕ Add", command=add_record, **btn_kwargs),
+        Button(entry_frame, text="✏️ Update", command=update_record, **btn_kwargs),
+        Button(entry_frame, text="🗑️ Delete", command=delete_record, **btn_kwargs),
+        Button(entry_frame, text="💾 Save to Database", command=save_changes, bootstyle="primary-outline", width=20, padding=10),
+    ]
+    for i, button in enumerate(edit_buttons):
+        button.grid(row=2, column=i, pady=15)
+
+def set_editing(enabled):
+    for button in edit_buttons:
+        button.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
+def shown_schema():
+    # Edits always apply to the table on screen, whatever the table picker shows meanwhile
+    if pager is None or runner.running("table"):
+        return None
+    return pager.schema
 
 # --- CRUD Buffer Operations ---
 def add_record():
-    table = selected_table.get()
-    columns = load_table_columns(table)
-    values = [entry_vars[col].get().strip() for col in columns]
+    schema = shown_schema()
+    if not schema:
+        return
+    values = [entry_vars[col].get().strip() for col in schema.columns]
     if all(v == '' for v in values):
         messagebox.showwarning("Input Error", "All fields are empty!")
         return
-    tree.insert("", "end", values=values)
-    changes_buffer.append(("add", values))
+    item = tree.insert("", "end", values=values)
+    changes_buffer.append(("add", item, values))
     clear_inputs()
 
 def update_record():
+    schema = shown_schema()
+    if not schema:
+        return
     selected = tree.focus()
     if not selected:
         messagebox.showwarning("No Selection", "Please select a row to update.")
         return
-    columns = load_table_columns(selected_table.get())
-    new_values = [entry_vars[col].get().strip() for col in columns]
+    new_values = [entry_vars[col].get().strip() for col in schema.columns]
     old_values = tree.item(selected, "values")
     tree.item(selected, values=new_values)
-    changes_buffer.append(("update", old_values, new_values))
+    changes_buffer.append(("update", selected, old_values, new_values))
     clear_inputs()
 
 def delete_record():
+    if not shown_schema():
+        return
     selected = tree.focus()
     if not selected:
         messagebox.showwarning("No Selection", "Please select a row to delete.")
         return
     old_values = tree.item(selected, "values")
     tree.delete(selected)
-    changes_buffer.append(("delete", old_values))
+    changes_buffer.append(("delete", selected, old_values))
     clear_inputs()
 
 def clear_inputs():
     for var in entry_vars.values():
         var.set("")
 
-def save_changes():
-    table = selected_table.get()
-    columns = load_table_columns(table)
+# --- Save Changes ---
+MAX_PARAMS = 2000   # SQL Server allows 2100 parameters per statement
 
-    for change in changes_buffer:
-        if change[0] == "add":
-            values = change[1]
-            valid_cols = [col for col, val in zip(columns, values) if val != '']
-            valid_vals = [val for val in values if val != '']
-            query = f"INSERT INTO [{table}] ({', '.join(f'[{c}]' for c in valid_cols)}) VALUES ({', '.join(['?'] * len(valid_vals))})"
-            execute_query(query, valid_vals)
+def coalesce_changes(changes):
+    """Reduce the buffer to one net change per Treeview row: {item id: change}, in first-edit order."""
+    net = {}
+    for op, item, *values in changes:
+        previous = net.get(item)
+        if op == "add":
+            net[item] = ("add", values[0])
+        elif op == "update":
+            old_values, new_values = values
+            if previous is None:
+                net[item] = ("update", old_values, new_values)
+            elif previous[0] == "add":
+                net[item] = ("add", new_values)
+            else:
+                net[item] = ("update", previous[1], new_values)
+        elif op == "delete":
+            if previous is None:
+                net[item] = ("delete", values[0])
+            elif previous[0] == "add":
+                del net[item]          # added and deleted before saving: nothing to send
+            else:
+                net[item] = ("delete", previous[1])
+    return net
+
+def plan_batches(table, schema, net):
+    """Group net changes into batches and note which saved rows to read back.
 
+    Returns (batches, reread). Each batch is (kind, statement, rows, items): "many" batches
+    go through executemany; "returning" batches are inserts whose key the server generates,
+    with statement holding the filled columns. reread maps item id -> key of rows whose key
+    is already known. An insert with an empty key column the server does not generate is
+    sent as is and not read back, since its key is unknown.
+    """
+    columns, key_columns = schema.columns, schema.key_columns
+    key_index = [columns.index(col) for col in key_columns]
+    key_filter = " AND ".join(f"[{col}] = ?" for col in key_columns)
+    deletes, updates, inserts, reread = [], {}, {}, {}
+
+    for item, change in net.items():
+        if change[0] == "delete":
+            deletes.append([change[1][i] for i in key_index])
         elif change[0] == "update":
             old_values, new_values = change[1], change[2]
-            pk = old_values[0]
-            query = f"UPDATE [{table}] SET {', '.join([f'[{col}] = ?' for col in columns[1:]])} WHERE [{columns[0]}] = ?"
-            execute_query(query, new_values[1:] + [pk])
+            key = [old_values[i] for i in key_index]
+            changed = tuple(col for col, old, new in zip(columns, old_values, new_values)
+                            if col not in key_columns and str(old) != str(new))
+            if changed:
+                values = [new_values[columns.index(col)] for col in changed]
+                updates.setdefault(changed, []).append(values + key)
+            reread[item] = key
+        else:
+            values = change[1]
+            filled = tuple(col for col, val in zip(columns, values) if val != '')
+            missing = [col for col, i in zip(key_columns, key_index) if values[i] == '']
+            generated = bool(missing) and all(col in schema.generated_keys for col in missing)
+            rows, items = inserts.setdefault((filled, generated), ([], []))
+            rows.append([val for val in values if val != ''])
+            items.append(item)
+            if not missing:
+                reread[item] = [values[i] for i in key_index]
 
-        elif change[0] == "delete":
-            pk = change[1][0]
-            query = f"DELETE FROM [{table}] WHERE [{columns[0]}] = ?"
-            execute_query(query, (pk,))
+    batches = []
+    if deletes:
+        batches.append(("many", f"DELETE FROM [{table}] WHERE {key_filter}", deletes, None))
+    for changed, rows in updates.items():
+        batches.append(("many", f"UPDATE [{table}] SET {', '.join(f'[{col}] = ?' for col in changed)} WHERE {key_filter}",
+                        rows, None))
+    for (filled, generated), (rows, items) in inserts.items():
+        if generated:
+            batches.append(("returning", filled, rows, items))
+        else:
+            batches.append(("many", f"INSERT INTO [{table}] ({', '.join(f'[{c}]' for c in filled)}) "
+                                    f"VALUES ({', '.join(['?'] * len(filled))})", rows, items))
+    return batches, reread
 
+def insert_returning_keys(cursor, schema, filled, rows):
+    # MERGE ... OUTPUT can name source columns, so each generated key is tied to its input row;
+    # OUTPUT INTO a table variable keeps this working on tables with triggers
+    key_columns = schema.key_columns
+    names = ", ".join(f"[{col}]" for col in filled)
+    key_names = ", ".join(f"[{col}]" for col in key_columns)
+    key_defs = ", ".join(f"[{col}] {schema.types[col]}" for col in key_columns)
+    keys = []
+    per_chunk = max(MAX_PARAMS // max(len(filled), 1), 1)
+    for start in range(0, len(rows), per_chunk):
+        chunk = rows[start:start + per_chunk]
+        source = ", ".join(f"({n}{', ?' * len(filled)})" for n in range(len(chunk)))
+        cursor.execute(f"""
+            SET NOCOUNT ON;
+            DECLARE @keys TABLE ([__n] int, {key_defs});
+            MERGE INTO [{schema.name}] AS t
+            USING (VALUES {source}) AS src([__n], {names})
+            ON 1 = 0
+            WHEN NOT MATCHED THEN INSERT ({names}) VALUES ({', '.join(f'src.[{col}]' for col in filled)})
+            OUTPUT src.[__n], {', '.join(f'INSERTED.[{col}]' for col in key_columns)} INTO @keys;
+            SELECT {key_names} FROM @keys ORDER BY [__n];
+        """, [val for row in chunk for val in row])
+        keys.extend(list(row) for row in cursor.fetchall())
+    return keys
+
+def fetch_rows_by_key(cursor, schema, keys):
+    # Returns the current row for each key (None if it is gone), matched by position
+    key_columns = schema.key_columns
+    columns = ", ".join(f"t.[{col}]" for col in schema.columns)
+    key_names = ", ".join(f"[{col}]" for col in key_columns)
+    join = " AND ".join(f"t.[{col}] = v.[{col}]" for col in key_columns)
+    found = [None] * len(keys)
+    per_chunk = max(MAX_PARAMS // len(key_columns), 1)
+    for start in range(0, len(keys), per_chunk):
+        chunk = keys[start:start + per_chunk]
+        source = ", ".join(f"({start + n}{', ?' * len(key_columns)})" for n in range(len(chunk)))
+        cursor.execute(f"SELECT v.[__n], {columns} FROM [{schema.name}] AS t "
+                       f"JOIN (VALUES {source}) AS v([__n], {key_names}) ON {join}",
+                       [val for key in chunk for val in key])
+        for n, *row in cursor.fetchall():
+            found[n] = row
+    return found
+
+def save_changes():
+    schema = shown_schema()
+    if runner.running("save") or not schema:
+        return
+    table = schema.name
+    pending = len(changes_buffer)
+    batches, reread = plan_batches(table, schema, coalesce_changes(changes_buffer))
+    runner.submit("save", lambda job: write_batches(schema, batches, reread, job),
+                  lambda saved: changes_saved(pending, saved), save_failed, f"Saving {pending} changes to {table}")
+
+def write_batches(schema, batches, reread, job):
+    # Every batch shares one transaction; the pool rolls it back if any statement fails.
+    # Afterwards only the saved rows are read back: {item id: row or None}, or None if that failed.
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        job.attach(cursor)
+        cursor.fast_executemany = True
+        for kind, statement, rows, items in batches:
+            if kind == "returning":
+                reread.update(zip(items, insert_returning_keys(cursor, schema, statement, rows)))
+            else:
+                cursor.executemany(statement, rows)
+        conn.commit()
+
+        items = list(reread)
+        try:
+            rows = fetch_rows_by_key(cursor, schema, [reread[item] for item in items])
+            conn.commit()
+        except pyodbc.Error:
+            return None
+        return dict(zip(items, rows))
+
+def changes_saved(pending, saved):
+    del changes_buffer[:pending]   # edits made while the save was running stay buffered
+    if saved is not None and pager:
+        pager.apply_saved(saved)
+    else:
+        refresh_table()
     messagebox.showinfo("Saved", "All changes saved successfully.")
-    changes_buffer.clear()
-    refresh_table()
+
+def save_failed(err):
+    if isinstance(err, QueryCancelled):
+        messagebox.showinfo("Cancelled", "Save cancelled. No changes were saved.")
+    else:
+        messagebox.showerror("SQL Error", f"No changes were saved.\n\n{err}")
+
+# --- Paged Browsing ---
+PAGE_SIZE = 500          # rows fetched per round trip
+MAX_WINDOW_ROWS = 2000   # rows kept in the Treeview; pages scrolled far out of view are dropped
+PREFETCH_AT = 0.85       # scroll fraction at which the next (or previous) page is loaded
+
+pager = None
+
+def estimate_row_count(table_name, job=None):
+    # Partition row counts are metadata only, so this stays instant on very large tables
+    rows = run_query("""
+        SELECT SUM(p.rows)
+        FROM sys.partitions p
+        JOIN sys.tables t ON t.object_id = p.object_id
+        WHERE t.name = ? AND p.index_id IN (0, 1)
+    """, (table_name,), fetch=True, job=job)
+    return int(rows[0][0] or 0) if rows else 0
+
+def keyset_filter(key_columns, key, descending=False):
+    # (k1, k2) > (v1, v2) spelled out as k1 > v1 OR (k1 = v1 AND k2 > v2)
+    op = "<" if descending else ">"
+    clauses, params = [], []
+    for i, col in enumerate(key_columns):
+        terms = [f"[{c}] = ?" for c in key_columns[:i]] + [f"[{col}] {op} ?"]
+        clauses.append(f"({' AND '.join(terms)})")
+        params.extend(key[:i + 1])
+    return " OR ".join(clauses), params
+
+# --- Filter, Sort and Search ---
+TEXT_TYPES = ("char", "varchar", "nchar", "nvarchar", "text", "ntext")
+FILTER_OPERATORS = ("=", "contains", "starts with", "<>", ">", ">=", "<", "<=")
+SEEKABLE_OPERATORS = ("=", "starts with", ">", ">=", "<", "<=")   # can use an index on the column
+
+def like_pattern(text, prefix=False):
+    escaped = text.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+    return f"{escaped}%" if prefix else f"%{escaped}%"
+
+class ViewSpec:
+    """Column filters, quick search and sort order of the table view, rendered as parameterized SQL."""
+
+    def __init__(self, filters=None, search="", sort_column=None, descending=False):
+        self.filters = dict(filters or {})     # column -> (operator, value)
+        self.search = search
+        self.sort_column = sort_column
+        self.descending = descending
+
+    def copy(self):
+        return ViewSpec(self.filters, self.search, self.sort_column, self.descending)
+
+    @property
+    def filtered(self):
+        return bool(self.filters or self.search)
+
+    def where(self, schema):
+        clauses, params = [], []
+        for col, (op, value) in self.filters.items():
+            if op == "contains":
+                clauses.append(f"[{col}] LIKE ?")
+                params.append(like_pattern(value))
+            elif op == "starts with":
+                clauses.append(f"[{col}] LIKE ?")
+                params.append(like_pattern(value, prefix=True))
+            else:
+                clauses.append(f"[{col}] {op} ?")
+                params.append(value)
+        if self.search:
+            text_columns = [col for col in schema.columns if schema.types[col].split("(")[0] in TEXT_TYPES]
+            matches = " OR ".join(f"[{col}] LIKE ?" for col in text_columns) or "1 = 0"
+            clauses.append(f"({matches})")
+            params.extend([like_pattern(self.search)] * len(text_columns))
+        return " AND ".join(clauses), params
+
+    def order_columns(self, schema):
+        # The primary key is appended so the order is unique and pages can continue from a row
+        if self.sort_column is None:
+            return list(schema.key_columns)
+        return [self.sort_column] + [col for col in schema.key_columns if col != self.sort_column]
+
+    def seekable(self, schema):
+        # Keyset paging needs a unique order without NULLs: a primary key and a NOT NULL sort column
+        return bool(schema.primary_key) and (self.sort_column is None or not schema.nullable[self.sort_column])
+
+    def index_hints(self, schema):
+        columns = [col for col, (op, _) in self.filters.items() if op in SEEKABLE_OPERATORS]
+        if self.sort_column:
+            columns.append(self.sort_column)
+        return [f"CREATE INDEX [IX_{schema.name}_{col}] ON [{schema.name}] ([{col}])"
+                for col in dict.fromkeys(columns) if col not in schema.indexed]
+
+view_spec = ViewSpec()
+
+def select_page(schema, spec, bound=None, backwards=False, offset=None, job=None):
+    # bound is the order key of the row to continue after (or before, when going backwards)
+    table = schema.name
+    columns = ", ".join(f"[{col}]" for col in schema.columns)
+    order_columns = spec.order_columns(schema)
+    descending = spec.descending != backwards
+    order = ", ".join(f"[{col}]{' DESC' if descending else ''}" for col in order_columns)
+    where, params = spec.where(schema)
+    if offset is not None:
+        query = (f"SELECT {columns} FROM [{table}] {'WHERE ' + where if where else ''} ORDER BY {order} "
+                 f"OFFSET ? ROWS FETCH NEXT ? ROWS ONLY")
+        return run_query(query, params + [offset, PAGE_SIZE], fetch=True, job=job)
+    if bound is not None:
+        seek, seek_params = keyset_filter(order_columns, bound, descending)
+        where = f"({where}) AND ({seek})" if where else seek
+        params += seek_params
+    query = f"SELECT TOP ({PAGE_SIZE}) {columns} FROM [{table}] {'WHERE ' + where if where else ''} ORDER BY {order}"
+    return run_query(query, params, fetch=True, job=job)
+
+class TablePager:
+    """Shows a sliding window of a table in the Treeview, loading pages by primary key as the user scrolls."""
+
+    def __init__(self, tree, schema, spec, status_label, estimate):
+        self.tree = tree
+        self.schema = schema
+        self.spec = spec
+        self.status_label = status_label
+        self.key_index = [schema.columns.index(col) for col in spec.order_columns(schema)]
+        # Without a unique, non-null order key, pages fall back to OFFSET/FETCH
+        self.keyset = spec.seekable(schema)
+        self.keys = {}         # item id -> order key of the rows currently in the window
+        self.offset = 0        # rows of the table that sit above the window
+        self.at_end = False
+        self.loading = False
+        self.estimate = estimate
+
+    # Fetches run on worker threads, so they only get plain values captured on the Tk thread
+    def fetch_after(self, key, start, job):
+        if not self.keyset:
+            return select_page(self.schema, self.spec, offset=start, job=job)
+        return select_page(self.schema, self.spec, bound=key, job=job)
+
+    def fetch_before(self, key, offset, job):
+        if not self.keyset:
+            start = max(offset - PAGE_SIZE, 0)
+            return select_page(self.schema, self.spec, offset=start, job=job)[:offset - start]
+        return select_page(self.schema, self.spec, bound=key, backwards=True, job=job)[::-1]
+
+    def row_key(self, row):
+        return tuple(row[i] for i in self.key_index)
+
+    def window(self):
+        # Rows added in the editor have no key yet and are not part of paging
+        return [item for item in self.tree.get_children() if item in self.keys]
+
+    def insert(self, rows, index="end"):
+        for row in (rows if index == "end" else reversed(rows)):
+            item = self.tree.insert("", index, values=list(row))
+            self.keys[item] = self.row_key(row)
+
+    def drop(self, items):
+        for item in items:
+            self.tree.delete(item)
+            del self.keys[item]
+
+    def show_first(self, rows):
+        self.tree.delete(*self.tree.get_children())
+        self.keys.clear()
+        self.offset = 0
+        self.insert(rows)
+        self.at_end = len(rows) < PAGE_SIZE
+        self.update_status()
+
+    def next_page(self):
+        items = self.window()
+        if self.at_end or not items:
+            return
+        key, start = self.keys[items[-1]], self.offset + len(items)
+        self.loading = True
+        runner.submit("page", lambda job: self.fetch_after(key, start, job), self.append,
+                      self.load_failed, "Loading more rows")
+
+    def append(self, rows):
+        self.loading = False
+        items = self.window()
+        self.at_end = len(rows) < PAGE_SIZE
+        self.insert(rows)
+        excess = len(items) + len(rows) - MAX_WINDOW_ROWS
+        if excess > 0:
+            self.keep_view(lambda: self.drop(items[:excess]), -excess)
+            self.offset += excess
+        self.update_status()
+
+    def previous_page(self):
+        items = self.window()
+        if self.offset == 0 or not items:
+            return
+        key, offset = self.keys[items[0]], self.offset
+        self.loading = True
+        runner.submit("page", lambda job: self.fetch_before(key, offset, job), self.prepend,
+                      self.load_failed, "Loading earlier rows")
+
+    def prepend(self, rows):
+        self.loading = False
+        if not rows:
+            self.offset = 0
+            return
+        items = self.window()
+        excess = len(items) + len(rows) - MAX_WINDOW_ROWS
+        self.keep_view(lambda: self.insert(rows, index=0), len(rows))
+        self.offset = max(self.offset - len(rows), 0)
+        if excess > 0:
+            self.drop(items[-excess:])
+            self.at_end = False
+        self.update_status()
+
+    def apply_saved(self, saved):
+        # Saved rows are updated in place, so the scroll position and selection survive the save
+        for item, row in saved.items():
+            if not self.tree.exists(item):
+                continue
+            if row is None:
+                self.tree.delete(item)
+            else:
+                self.tree.item(item, values=list(row))
+                if item in self.keys:
+                    self.keys[item] = self.row_key(row)
+        self.keys = {item: key for item, key in self.keys.items() if self.tree.exists(item)}
+        self.update_status()
+
+    def load_failed(self, err):
+        self.loading = False
+        report_error(err)
+
+    def keep_view(self, change, shift):
+        # Rows inserted or dropped above the view would make it jump; move it by the same number of rows
+        count = len(self.tree.get_children())
+        top = round(self.tree.yview()[0] * count)
+        change()
+        count = len(self.tree.get_children())
+        if count:
+            self.tree.yview_moveto(max(top + shift, 0) / count)
+
+    def on_scroll(self, first, last):
+        if self.loading:
+            return
+        if float(last) >= PREFETCH_AT:
+            self.next_page()
+        elif float(first) <= 1 - PREFETCH_AT:
+            self.previous_page()
+
+    def update_status(self):
+        shown = len(self.window())
+        total = max(self.estimate, self.offset + shown)
+        if not shown:
+            text = "No matching rows" if self.spec.filtered else "No rows"
+        elif not self.spec.filtered:
+            text = f"Rows {self.offset + 1:,}–{self.offset + shown:,} of ~{total:,}"
+        elif self.at_end:
+            text = f"Rows {self.offset + 1:,}–{self.offset + shown:,} of {self.offset + shown:,} matching"
+        else:
+            text = f"Rows {self.offset + 1:,}–{self.offset + shown:,} matching (more below)"
+        self.status_label.config(text=text)
+
+def on_tree_scroll(first, last):
+    tree_scroll.set(first, last)
+    if pager:
+        pager.on_scroll(first, last)
 
 def refresh_table():
-    for i in tree.get_children():
-        tree.delete(i)
+    global view_spec
     table = selected_table.get()
     if not table:
         return
-    columns = load_table_columns(table)
-    rows = execute_query(f"SELECT * FROM [{table}]", fetch=True)
-    tree["columns"] = columns
+    if table != entry_table:
+        # Buffered edits belong to the table on screen; another table's keys cannot apply them
+        if runner.running("save"):
+            messagebox.showinfo("Saving", f"Wait for the save to {entry_table} to finish.")
+            selected_table.set(entry_table)
+            return
+        if changes_buffer:
+            if not messagebox.askyesno("Unsaved Changes",
+                                       f"Discard {len(changes_buffer)} unsaved change(s) to {entry_table}?"):
+                selected_table.set(entry_table)
+                return
+            changes_buffer.clear()
+        view_spec = ViewSpec()   # filters and sort belong to the table they were set on
+    spec = view_spec.copy()
+    runner.invalidate("page")
+    set_editing(False)
+    runner.submit("table", lambda job: load_table(table, spec, job), show_table, table_load_failed,
+                  description=f"Loading {table}")
+
+def load_table(table, spec, job):
+    # Worker thread: schema, row estimate and first page, no Tk calls
+    schema = table_schema(table, revalidate=True, job=job)
+    spec.filters = {col: f for col, f in spec.filters.items() if col in schema.columns}
+    if spec.sort_column not in schema.columns:
+        spec.sort_column = None
+    return schema, spec, estimate_row_count(table, job), select_page(schema, spec, job=job)
+
+def show_table(result):
+    global pager
+    schema, spec, estimate, rows = result
+    runner.invalidate("page")   # pages requested by the previous pager must not land in this one
+    if entry_table != schema.name:
+        add_entry_fields(schema)
+    set_editing(True)
+    tree["columns"] = schema.columns
     tree["show"] = "headings"
-    for col in columns:
-        tree.heading(col, text=col)
+    for col in schema.columns:
+        arrow = (" ▼" if spec.descending else " ▲") if col == spec.sort_column else ""
+        tree.heading(col, text=col + arrow, command=lambda c=col: sort_by(c))
         tree.column(col, width=150)
-    for row in rows:
-        tree.insert("", "end", values=row)
+    filter_column.config(values=schema.columns)
+    show_filters(schema, spec)
+    pager = TablePager(tree, schema, spec, page_label, estimate)
+    pager.show_first(rows)
+
+def table_load_failed(err):
+    # The previous table (if any) is still on screen and can be edited again
+    if pager:
+        selected_table.set(pager.schema.name)
+        set_editing(True)
+    report_error(err)
+
+def show_filters(schema, spec):
+    active = [f"{col} {op} '{value}'" for col, (op, value) in spec.filters.items()]
+    if spec.search:
+        active.append(f"any text contains '{spec.search}'")
+    filters_label.config(text="Filters: " + "; ".join(active) if active else "")
+    hints = spec.index_hints(schema)
+    hint_label.config(text=f"💡 No index to seek on; consider: {hints[0]}  (click to copy)" if hints else "")
+
+def copy_index_hint(event=None):
+    text = hint_label.cget("text")
+    if "consider: " in text:
+        root.clipboard_clear()
+        root.clipboard_append(text.split("consider: ", 1)[1].split("  (click", 1)[0])
+
+def apply_filters(event=None):
+    col, op, value = filter_column.get(), filter_operator.get(), filter_value.get().strip()
+    if col and value:
+        view_spec.filters[col] = (op, value)
+    elif col:
+        view_spec.filters.pop(col, None)
+    view_spec.search = search_text.get().strip()
+    refresh_table()
+
+def clear_filters():
+    view_spec.filters.clear()
+    view_spec.search = ""
+    search_text.set("")
+    filter_value.delete(0, tk.END)
+    refresh_table()
+
+def sort_by(column):
+    if view_spec.sort_column == column:
+        view_spec.descending = not view_spec.descending
+    else:
+        view_spec.sort_column, view_spec.descending = column, False
+    refresh_table()
+
+def show_tables(rows):
+    table_list = [tbl[0] for tbl in rows]
+    table_combo.config(values=table_list)
+    if table_list and not selected_table.get():
+        selected_table.set(table_list[0])
+    refresh_table()
+
+def close_window():
+    runner.shutdown()
+    root.destroy()
+
+# --- Export / Import ---
+EXPORT_BATCH = 10000          # rows per fetchmany while exporting
+IMPORT_BATCH = 5000           # rows per executemany + commit while importing
+MAX_REPORTED_ERRORS = 20
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+INTEGER_RANGES = {
+    "tinyint": (0, 255),
+    "smallint": (-2 ** 15, 2 ** 15 - 1),
+    "int": (-2 ** 31, 2 ** 31 - 1),
+    "bigint": (-2 ** 63, 2 ** 63 - 1),
+}
+
+def base_type(sql_type):
+    return sql_type.split("(")[0]
+
+def arrow_type(sql_type):
+    # Anything without a precise Arrow equivalent is exported as text
+    import pyarrow as pa
+    name = base_type(sql_type)
+    if name in INTEGER_RANGES:
+        return pa.uint8() if name == "tinyint" else {"smallint": pa.int16(), "int": pa.int32(), "bigint": pa.int64()}[name]
+    if name == "bit":
+        return pa.bool_()
+    if name in ("decimal", "numeric"):
+        precision, scale = sql_type[len(name) + 1:-1].split(",")
+        return pa.decimal128(int(precision), int(scale))
+    if name in ("money", "smallmoney"):
+        return pa.decimal128(19, 4)
+    if name in ("float", "real"):
+        return pa.float64() if name == "float" else pa.float32()
+    if name == "date":
+        return pa.date32()
+    if name in ("datetime", "datetime2", "smalldatetime"):
+        return pa.timestamp("us")
+    if name in ("binary", "varbinary", "image"):
+        return pa.binary()
+    return pa.string()
+
+def select_all(schema, spec):
+    # Same rows and order as the view: current filters and sort apply to exports
+    columns = ", ".join(f"[{col}]" for col in schema.columns)
+    order = ", ".join(f"[{col}]{' DESC' if spec.descending else ''}" for col in spec.order_columns(schema))
+    where, params = spec.where(schema)
+    return f"SELECT {columns} FROM [{schema.name}] {'WHERE ' + where if where else ''} ORDER BY {order}", params
+
+class CsvExport:
+    def __init__(self, path, schema):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(schema.columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class ParquetExport:
+    def __init__(self, path, schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([(col, arrow_type(schema.types[col])) for col in schema.columns])
+        self.text_columns = [i for i, field in enumerate(self.schema) if field.type == pa.string()]
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = [list(values) for values in zip(*rows)]
+        for i in self.text_columns:
+            columns[i] = [None if v is None else str(v) for v in columns[i]]
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def export_table(schema, spec, path, job):
+    """Stream the view to CSV or Parquet in EXPORT_BATCH chunks; returns (rows, seconds)."""
+    started = time.perf_counter()
+    query, params = select_all(schema, spec)
+    label = job.description
+    rows_written = 0
+    try:
+        with db_pool.connection() as conn:
+            cursor = conn.cursor()
+            job.attach(cursor)
+            cursor.execute(query, params)
+            writer = (ParquetExport if path.lower().endswith(".parquet") else CsvExport)(path, schema)
+            try:
+                while True:
+                    batch = cursor.fetchmany(EXPORT_BATCH)
+                    if not batch:
+                        break
+                    if job.cancelled.is_set():
+                        raise QueryCancelled(label)
+                    writer.write(batch)
+                    rows_written += len(batch)
+                    job.description = f"{label}: {rows_written:,} rows"
+            finally:
+                writer.close()
+            conn.commit()
+    except BaseException:
+        # A cancelled or failed export leaves no partial file behind
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return rows_written, time.perf_counter() - started
+
+def source_columns(path):
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def iter_source_rows(path):
+    # Rows as lists in source column order, without the header
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=IMPORT_BATCH):
+            yield from (list(row) for row in zip(*(column.to_pylist() for column in batch.columns)))
+        return
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        yield from reader
+
+def source_number(value, name):
+    # Parquet values arrive typed; only numbers (or numeric text) convert to a numeric column
+    if isinstance(value, str):
+        return value.strip()
+    if not isinstance(value, (int, float, decimal.Decimal)):
+        raise ValueError(f"{value!r} is not a number for {name}")
+    return value
+
+def convert_value(sql_type, nullable, value):
+    # Returns the value as the Python type pyodbc binds for the column, or raises ValueError.
+    # Typed Parquet values get the same range/precision/length checks as CSV text
+    if value is None or value == "":
+        if not nullable:
+            raise ValueError("NULL not allowed")
+        return None
+    name = base_type(sql_type)
+    if name in INTEGER_RANGES:
+        source = source_number(value, name)
+        number = int(source)
+        if not isinstance(source, str) and number != source:
+            raise ValueError(f"{value} is not a whole number")
+        low, high = INTEGER_RANGES[name]
+        if not low <= number <= high:
+            raise ValueError(f"{number} out of range for {name}")
+        return number
+    if name == "bit":
+        source = source_number(value, name)
+        if isinstance(source, str):
+            if source.lower() not in ("0", "1", "true", "false"):
+                raise ValueError(f"'{value}' is not a bit")
+            return source.lower() in ("1", "true")
+        if source not in (0, 1):
+            raise ValueError(f"{value} is not a bit")
+        return bool(source)
+    if name in ("decimal", "numeric", "money", "smallmoney"):
+        number = decimal.Decimal(str(source_number(value, name)))
+        if not number.is_finite():
+            raise ValueError(f"{value} does not fit {sql_type}")
+        if name in ("decimal", "numeric"):
+            precision, scale = (int(part) for part in sql_type[len(name) + 1:-1].split(","))
+            if number and number.adjusted() + 1 > precision - scale:
+                raise ValueError(f"{value} does not fit {sql_type}")
+        return number
+    if name in ("float", "real"):
+        return float(source_number(value, name))
+    if name == "date":
+        if isinstance(value, datetime.date):
+            return value.date() if isinstance(value, datetime.datetime) else value
+        if not isinstance(value, str):
+            raise ValueError(f"{value!r} is not a date")
+        return datetime.date.fromisoformat(value.strip())
+    if name in ("datetime", "datetime2", "smalldatetime"):
+        if isinstance(value, datetime.datetime):
+            return value
+        if isinstance(value, datetime.date):
+            return datetime.datetime.combine(value, datetime.time())
+        if not isinstance(value, str):
+            raise ValueError(f"{value!r} is not a datetime")
+        return datetime.datetime.fromisoformat(value.strip())
+    if name in ("char", "varchar", "nchar", "nvarchar"):
+        value = value if isinstance(value, str) else str(value)
+        if not sql_type.endswith("(max)"):
+            length = int(sql_type[len(name) + 1:-1])
+            if len(value) > length:
+                raise ValueError(f"{len(value)} characters exceed {sql_type}")
+    return value
+
+def import_file(schema, path, mapping, dry_run, job):
+    """Load a CSV/Parquet file into the table through mapping {table column: source column}.
+
+    Rows are converted to the column types and sent in IMPORT_BATCH executemany batches, each
+    committed on its own. A dry run only validates. A real import stops before the batch that
+    holds the first invalid row. Returns (rows, error_count, first_errors, seconds).
+    """
+    started = time.perf_counter()
+    targets = [col for col in schema.columns if mapping.get(col)]
+    source_index = {name: i for i, name in enumerate(source_columns(path))}
+    fields = [(source_index[mapping[col]], schema.types[col], schema.nullable[col]) for col in targets]
+    insert = (f"INSERT INTO [{schema.name}] ({', '.join(f'[{col}]' for col in targets)}) "
+              f"VALUES ({', '.join(['?'] * len(targets))})")
+    label = job.description
+    rows_done, error_count, errors = 0, 0, []
+
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        job.attach(cursor)
+        cursor.fast_executemany = True
+        batch = []
+        for line, row in enumerate(iter_source_rows(path), start=2):
+            if job.cancelled.is_set():
+                raise QueryCancelled(label)
+            try:
+                batch.append([convert_value(sql_type, nullable, row[i] if i < len(row) else None)
+                              for i, sql_type, nullable in fields])
+            except (ValueError, ArithmeticError) as err:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append((line, str(err)))
+                if dry_run:
+                    continue
+                break
+            if len(batch) >= IMPORT_BATCH:
+                if not dry_run:
+                    cursor.executemany(insert, batch)
+                    conn.commit()
+                rows_done += len(batch)
+                batch = []
+                job.description = f"{label}: {rows_done:,} rows"
+        else:
+            if batch and not dry_run:
+                cursor.executemany(insert, batch)
+                conn.commit()
+            rows_done += len(batch)
+    return rows_done, error_count, errors, time.perf_counter() - started
+
+def rate(rows, seconds):
+    return f"{rows / seconds:,.0f} rows/s" if seconds > 0 else "-"
+
+def export_view():
+    if not pager:
+        return
+    filetypes = [("CSV", "*.csv")] + ([("Parquet", "*.parquet")] if PARQUET_AVAILABLE else [])
+    path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=filetypes,
+                                        initialfile=f"{pager.schema.name}.csv")
+    if not path:
+        return
+    schema, spec = pager.schema, pager.spec
+    runner.submit("export", lambda job: export_table(schema, spec, path, job),
+                  lambda result: messagebox.showinfo(
+                      "Exported", f"{result[0]:,} rows written to {path}\n"
+                                  f"{result[1]:.1f}s ({rate(*result)})"),
+                  description=f"Exporting {schema.name}")
+
+def import_into_table():
+    if not pager:
+        return
+    filetypes = [("CSV", "*.csv")] + ([("Parquet", "*.parquet")] if PARQUET_AVAILABLE else [])
+    path = filedialog.askopenfilename(filetypes=filetypes)
+    if not path:
+        return
+    try:
+        headers = source_columns(path)
+    except (OSError, ValueError) as err:
+        messagebox.showerror("Import Error", str(err))
+        return
+    show_import_dialog(pager.schema, path, headers)
+
+def show_import_dialog(schema, path, headers):
+    dialog = tk.Toplevel(root)
+    dialog.title(f"Import into {schema.name}")
+    Label(dialog, text=os.path.basename(path), font=("Times New Roman", 12, "bold")).grid(row=0, column=0, columnspan=2, pady=10)
+    by_name = {header.lower(): header for header in headers}
+    choices = {}
+    for row, col in enumerate(schema.columns, start=1):
+        Label(dialog, text=f"{col} ({schema.types[col]})", font=("Times New Roman", 10)).grid(row=row, column=0, padx=10, pady=2, sticky="w")
+        choice = Combobox(dialog, values=["(skip)"] + headers, width=24, state="readonly")
+        # Identity columns are generated by the server, so they are skipped unless mapped by hand
+        choice.set("(skip)" if col in schema.identity else by_name.get(col.lower(), "(skip)"))
+        choice.grid(row=row, column=1, padx=10, pady=2)
+        choices[col] = choice
+    dry_run = tk.BooleanVar(value=True)
+    tk.Checkbutton(dialog, text="Dry run (validate only)", variable=dry_run).grid(row=len(schema.columns) + 1, column=0, columnspan=2)
+
+    def start():
+        mapping = {col: choice.get() for col, choice in choices.items() if choice.get() != "(skip)"}
+        if not mapping:
+            messagebox.showwarning("Import", "Map at least one column.", parent=dialog)
+            return
+        validate_only = dry_run.get()
+        dialog.destroy()
+        runner.submit("import", lambda job: import_file(schema, path, mapping, validate_only, job),
+                      lambda result: import_finished(result, validate_only),
+                      description=f"{'Validating' if validate_only else 'Importing'} {os.path.basename(path)}")
+
+    Button(dialog, text="⬆ Start", command=start, bootstyle="primary-outline", width=14).grid(row=len(schema.columns) + 2, column=0, columnspan=2, pady=10)
+
+def import_finished(result, dry_run):
+    rows, error_count, errors, seconds = result
+    details = "\n".join(f"Line {line}: {message}" for line, message in errors)
+    if dry_run:
+        summary = f"{rows:,} valid rows, {error_count:,} invalid ({seconds:.1f}s, {rate(rows, seconds)})"
+        (messagebox.showwarning if errors else messagebox.showinfo)("Dry Run", summary + ("\n\n" + details if details else ""))
+        return
+    summary = f"{rows:,} rows imported in {seconds:.1f}s ({rate(rows, seconds)})"
+    if errors:
+        messagebox.showerror("Import Stopped", f"{summary}; stopped at an invalid row.\n\n{details}")
+    else:
+        messagebox.showinfo("Imported", summary)
+    refresh_table()
 
 # --- Main GUI ---
 def main():
-    global root, selected_table, entry_frame, tree
+    global root, selected_table, entry_frame, tree, tree_scroll, page_label, table_combo, runner
+    global search_text, filter_column, filter_operator, filter_value, filters_label, hint_label
 
     style = Style("litera")
     root = style.master
@@ -169,19 +1335,57 @@ def main():
     top_frame.pack(pady=10)
 
     selected_table = StringVar()
-    tables = execute_query("SELECT name FROM sys.tables", fetch=True)
-    table_list = [tbl[0] for tbl in tables]
-    if table_list:
-        selected_table.set(table_list[0])
 
     Label(top_frame, text="Select Table:", font=("Times New Roman", 11)).grid(row=0, column=0, padx=10)
-    Combobox(top_frame, textvariable=selected_table, values=table_list, font=("Times New Roman", 10), width=20).grid(row=0, column=1)
+    table_combo = Combobox(top_frame, textvariable=selected_table, values=[], font=("Times New Roman", 10), width=20)
+    table_combo.grid(row=0, column=1)
+    table_combo.bind("<<ComboboxSelected>>", lambda event: refresh_table())
     Button(top_frame, text="🔄 Load Table", command=refresh_table, bootstyle="info-outline", width=16, padding=7).grid(row=0, column=2, padx=10)
+    Button(top_frame, text="⬇ Export", command=export_view, bootstyle="info-outline", width=12, padding=7).grid(row=0, column=3, padx=5)
+    Button(top_frame, text="⬆ Import", command=import_into_table, bootstyle="info-outline", width=12, padding=7).grid(row=0, column=4, padx=5)
+
+    # Search and Filter Bar
+    filter_frame = Frame(root, padding=(10, 0))
+    filter_frame.pack()
+    search_text = StringVar()
+    Label(filter_frame, text="Search:", font=("Times New Roman", 11)).grid(row=0, column=0, padx=5)
+    search_entry = Entry(filter_frame, textvariable=search_text, font=("Times New Roman", 10), width=22)
+    search_entry.grid(row=0, column=1, padx=5)
+    search_entry.bind("<Return>", apply_filters)
+    Label(filter_frame, text="Filter:", font=("Times New Roman", 11)).grid(row=0, column=2, padx=(20, 5))
+    filter_column = Combobox(filter_frame, values=[], font=("Times New Roman", 10), width=16, state="readonly")
+    filter_column.grid(row=0, column=3, padx=5)
+    filter_operator = Combobox(filter_frame, values=FILTER_OPERATORS, font=("Times New Roman", 10), width=10, state="readonly")
+    filter_operator.set(FILTER_OPERATORS[0])
+    filter_operator.grid(row=0, column=4, padx=5)
+    filter_value = Entry(filter_frame, font=("Times New Roman", 10), width=18)
+    filter_value.grid(row=0, column=5, padx=5)
+    filter_value.bind("<Return>", apply_filters)
+    Button(filter_frame, text="🔍 Apply", command=apply_filters, bootstyle="info-outline", width=10).grid(row=0, column=6, padx=5)
+    Button(filter_frame, text="✖ Clear", command=clear_filters, bootstyle="secondary-outline", width=10).grid(row=0, column=7, padx=5)
+    filters_label = Label(filter_frame, text="", font=("Times New Roman", 10))
+    filters_label.grid(row=1, column=0, columnspan=8, pady=(5, 0))
+    hint_label = Label(filter_frame, text="", font=("Times New Roman", 10), bootstyle="warning", cursor="hand2")
+    hint_label.grid(row=2, column=0, columnspan=8)
+    hint_label.bind("<Button-1>", copy_index_hint)
 
     # Entry Fields
     entry_frame = Frame(root, padding=10)
     entry_frame.pack(pady=10)
 
+    # Status Bar: visible rows, running query, progress and cancel
+    status_frame = Frame(root, padding=(20, 0))
+    status_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 10))
+    page_label = Label(status_frame, text="", font=("Times New Roman", 10))
+    page_label.pack(side=tk.LEFT)
+    cancel_button = Button(status_frame, text="✖ Cancel", command=lambda: runner.cancel_all(),
+                           bootstyle="danger-outline", state=tk.DISABLED)
+    cancel_button.pack(side=tk.RIGHT)
+    progress = Progressbar(status_frame, mode="indeterminate", length=160, bootstyle="info-striped")
+    progress.pack(side=tk.RIGHT, padx=10)
+    query_label = Label(status_frame, text="", font=("Times New Roman", 10))
+    query_label.pack(side=tk.RIGHT)
+
     # TreeView Display
     tree_frame = Frame(root, bootstyle="secondary", padding=5)
     tree_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
@@ -189,13 +1393,16 @@ def main():
     tree_scroll = Scrollbar(tree_frame)
     tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
-    tree = Treeview(tree_frame, yscrollcommand=tree_scroll.set)
+    tree = Treeview(tree_frame, yscrollcommand=on_tree_scroll)
     tree.pack(fill=tk.BOTH, expand=True)
     tree_scroll.config(command=tree.yview)
 
-    # Populate Fields and Table
-    add_entry_fields()
-    refresh_table()
+    runner = QueryRunner(root, query_label, progress, cancel_button)
+    root.protocol("WM_DELETE_WINDOW", close_window)
+
+    # Populate Tables, Fields and Table in the background
+    runner.submit("tables", lambda job: run_query("SELECT name FROM sys.tables", fetch=True, job=job),
+                  show_tables, description="Listing tables")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,9 +1,24 @@
+from contextlib import contextmanager
+import ctypes
+import ctypes.util
+import datetime
+from decimal import Decimal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import hashlib
+import importlib.util
+import json
+import openpyxl
 import os
 import pandas as pd
 import pyodbc
+import select
+import struct
+import sys
+import tempfile
 import threading
 import time
 import tkinter as tk
+import uuid
 from tkinter import scrolledtext
 
 # --- SQL Server Configuration ---
@@ -14,6 +29,45 @@ DB_CONFIG = {
 }
 
 FOLDER_PATH = r'C:\Users\Nikhil Sharma\Desktop\SSMS'
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls")
+
+# --- Streaming Configuration ---
+STREAMING_MIN_BYTES = 50 * 1024 * 1024   # files at least this large are loaded chunk by chunk
+CHUNK_SIZE = 50000                       # rows per chunk (bounds peak memory)
+TYPE_SAMPLE_CHUNKS = 2                   # chunks inspected before the table is created
+
+# --- Parallel Configuration ---
+PARALLEL_INGEST = True                      # parse files in processes, write on a connection pool
+PARSE_WORKERS = os.cpu_count() or 2         # processes parsing/cleaning files
+DB_WORKERS = 4                              # writer threads, one connection each
+
+# --- Upsert Configuration ---
+UPSERT_SYNC = True          # merge row-level changes into tables that carry a row hash column
+UPSERT_KEYS = {}            # table_name -> key column (cleaned name); overrides inference
+INFER_UPSERT_KEYS = True    # otherwise use the first column when it is unique and never empty
+ROW_HASH_COLUMN = '__row_hash'
+UPSERT_STAGE_TABLE = '#upsert_stage'
+
+# --- Bulk Load Configuration ---
+LOAD_STRATEGY = 'auto'          # 'auto', 'fast_executemany', 'tvp' or 'bulk_file'
+BATCH_TARGET_CELLS = 1000000    # values per round trip; rows per batch = this / column count
+MIN_BATCH_ROWS, MAX_BATCH_ROWS = 1000, 100000
+BULK_INSERT_DIR = None          # folder the SQL Server service account can read; enables 'bulk_file'
+BULK_FILE_MIN_ROWS = 200000     # 'auto' only stages a temp file for loads at least this large
+
+# --- Parse Cache Configuration ---
+PARSE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".sperene_cache", "parsed")
+PARSE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024   # least recently used entries are evicted above this
+PARSE_CACHE_EXTENSIONS = ('.xlsx', '.xls')       # CSV parses fast enough without a cache
+PARSE_CACHE_ENABLED = importlib.util.find_spec("pyarrow") is not None
+PARSE_CACHE_VERSION = 2   # part of every cache key; bump when parsing or typing changes so older frames are never served
+
+# --- Metrics Configuration ---
+SLOWEST_FILES_LIMIT = 10        # rows shown by the "Slowest Files" button
+
+# --- Watch Configuration ---
+WATCH_DEBOUNCE = 0.5      # seconds a file must stay quiet before it is ingested
+POLL_INTERVAL = 2.0       # folder listing interval when inotify is unavailable
 
 # --- DB Connection ---
 def get_connection():
@@ -29,7 +83,7 @@ def validate_and_clean_data(df):
     seen = set()
     new_columns = []
     for i, col in enumerate(df.columns):
-        new_col = col.strip() if str(col).strip() else f"Unnamed_{i+1}"
+        new_col = str(col).strip() or f"Unnamed_{i+1}"
         while new_col in seen:
             new_col += "_dup"
         seen.add(new_col)
@@ -53,6 +107,159 @@ def clean_large_ints(df):
             df[col] = df[col].astype('int64')
     return df
 
+# --- Type Inference ---
+INT_RANGE = (-2147483648, 2147483647)
+BIGINT_LIMIT = 2 ** 63
+MAX_DECIMAL_PRECISION = 38
+NVARCHAR_BUCKETS = (16, 32, 64, 128, 255, 512, 1024, 2000, 4000)
+BOOLEAN_TEXT = {'true': True, 'false': False, 'yes': True, 'no': False}
+DATE_TEXT = r'^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?$'
+# A text column becomes dates only if one of these formats reads every value; ambiguous
+# day/month orders are decided by the probe rows and then applied to the whole column
+DATE_FORMATS = ['ISO8601'] + [order.format(sep) + time for sep in '-/.'
+                              for order in ('%m{0}%d{0}%Y', '%d{0}%m{0}%Y', '%Y{0}%m{0}%d')
+                              for time in ('', ' %H:%M', ' %H:%M:%S', ' %H:%M:%S.%f')]
+TYPE_PROBE_ROWS = 100     # text columns are probed on a few rows before the full conversion
+
+def nvarchar_type(length):
+    for bucket in NVARCHAR_BUCKETS:
+        if length <= bucket:
+            return f'NVARCHAR({bucket})'
+    return 'NVARCHAR(MAX)'
+
+def decimal_or_float(int_digits, scale):
+    precision = int_digits + scale
+    return f'DECIMAL({precision},{scale})' if precision <= MAX_DECIMAL_PRECISION else 'FLOAT'
+
+def integer_type(values):
+    if values.empty or (values.min() >= INT_RANGE[0] and values.max() <= INT_RANGE[1]):
+        return 'INT'
+    return 'BIGINT'
+
+def decimal_type(text):
+    if text.str.contains('[eE]').any():
+        return 'FLOAT'
+    parts = text.str.lstrip('+-').str.split('.', n=1, expand=True)
+    int_digits = int(parts[0].str.lstrip('0').str.len().max())
+    scale = int(parts[1].fillna('').str.len().max()) if parts.shape[1] > 1 else 0
+    return decimal_or_float(max(int_digits, 1), scale)
+
+def decimal_values(values, sql_type):
+    # Exact values at the column's scale, so the text, the row hash and the stored value agree
+    scale = Decimal(1).scaleb(-int(parse_sql_type(sql_type)[1][1]))
+    return values.map(lambda text: Decimal(text).quantize(scale))
+
+def is_decimal_column(series):
+    present = series.dropna()
+    return not present.empty and isinstance(present.iloc[0], Decimal)
+
+def text_column(series):
+    # Kept as text: strings stay as read, other values are written the way str() shows them
+    if series.dtype != object:
+        series = series.astype(object).where(series.notna(), None).map(lambda v: v if v is None else str(v))
+    lengths = series.dropna().astype(str).str.len()
+    return series, nvarchar_type(int(lengths.max()) if not lengths.empty else 0)
+
+def date_type(dates):
+    present = dates.dropna()
+    return 'DATE' if (present == present.dt.normalize()).all() else 'DATETIME'
+
+def is_integral(numbers):
+    return bool((numbers % 1 == 0).all()) and (numbers.empty or numbers.abs().max() < BIGINT_LIMIT)
+
+def parse_dates(values):
+    # Dates read with the first format that fits the probe rows, or None if any value does not fit it
+    sample = values.head(TYPE_PROBE_ROWS)
+    for date_format in DATE_FORMATS:
+        if pd.to_datetime(sample, errors='coerce', format=date_format).notna().all():
+            dates = pd.to_datetime(values, errors='coerce', format=date_format)
+            return dates if dates.notna().all() else None
+    return None
+
+def infer_text_column(col):
+    text = col.astype(str).str.strip()
+    present = text != ""
+    values = text[present]
+    if values.empty:
+        return col, nvarchar_type(0)
+
+    lowered = values.str.lower()
+    if lowered.head(TYPE_PROBE_ROWS).isin(BOOLEAN_TEXT).all() and lowered.isin(BOOLEAN_TEXT).all():
+        return lowered.map(BOOLEAN_TEXT).reindex(col.index).astype('boolean'), 'BIT'
+
+    # Leading zeros (zip codes, article numbers) stay text
+    if not values.str.match(r'^[+-]?0\d').any():
+        if pd.to_numeric(values.head(TYPE_PROBE_ROWS), errors='coerce').notna().all():
+            numbers = pd.to_numeric(values, errors='coerce')
+            if numbers.notna().all():
+                whole = not values.str.contains('[.eE]').any()
+                if whole and is_integral(numbers):
+                    return numbers.reindex(col.index).astype('Int64'), integer_type(numbers)
+                if not whole:
+                    sql_type = decimal_type(values)
+                    if sql_type == 'FLOAT':
+                        return numbers.reindex(col.index).astype('float64'), sql_type
+                    return decimal_values(values, sql_type).reindex(col.index), sql_type
+
+    if values.head(TYPE_PROBE_ROWS).str.match(DATE_TEXT).all() and values.str.match(DATE_TEXT).all():
+        dates = parse_dates(values)
+        if dates is not None:
+            return dates.reindex(col.index), date_type(dates)
+
+    return col, nvarchar_type(int(text.str.len().max()))
+
+def infer_column_types(df, text_columns=frozenset()):
+    """Convert each column to its tightest type and return (df, sql_types).
+
+    Works on whole columns at once and is idempotent: already typed columns only
+    have their range checked, so calling it again on a typed frame is cheap.
+    Columns in text_columns are left as text.
+    """
+    # Decimal scale is only visible in the original text, so it is remembered in attrs
+    hints = df.attrs.get('sql_types', {})
+    sql_types = []
+    for col in df.columns:
+        series = df[col]
+        if col in text_columns:
+            df[col], sql_type = text_column(series)
+        elif pd.api.types.is_bool_dtype(series):
+            df[col], sql_type = series.astype('boolean'), 'BIT'
+        elif pd.api.types.is_integer_dtype(series):
+            df[col], sql_type = series.astype('Int64'), integer_type(series.dropna())
+        elif pd.api.types.is_float_dtype(series):
+            present = series.dropna()
+            if is_integral(present) and not present.empty:
+                df[col], sql_type = series.astype('Int64'), integer_type(present)
+            else:
+                hint = hints.get(col, '')
+                sql_type = hint if hint.startswith('DECIMAL') else 'FLOAT'
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            sql_type = date_type(series)
+        elif is_decimal_column(series):
+            sql_type = hints.get(col) or decimal_type(series.dropna().map(lambda v: format(v, 'f')))
+        else:
+            df[col], sql_type = infer_text_column(series)
+        sql_types.append(sql_type)
+    df.attrs['sql_types'] = dict(zip(df.columns, sql_types))
+    return df, sql_types
+
+def column_buffer(series, sql_type=None):
+    # Native Python values (int, float, bool, date, str, None) in column order
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = list(series.dt.date) if sql_type == 'DATE' else series.astype(object).tolist()
+    elif sql_type and sql_type.startswith('DECIMAL') and pd.api.types.is_float_dtype(series):
+        values = [Decimal(repr(value)) for value in series.tolist()]
+    else:
+        values = series.astype(object).tolist()
+    missing = series.isna()
+    if missing.any():
+        values = [None if gap else value for value, gap in zip(values, missing.tolist())]
+    return values
+
+def frame_rows(df, sql_types=None):
+    sql_types = sql_types or [None] * len(df.columns)
+    return list(zip(*(column_buffer(df[col], sql_type) for col, sql_type in zip(df.columns, sql_types))))
+
 # --- SQL Helpers ---
 def table_exists(cursor, table_name):
     cursor.execute("SELECT * FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = ?", (table_name,))
@@ -71,23 +278,191 @@ def create_table_information_table(cursor):
     )
     """)
 
+SQL_TYPES = {
+    'object': 'NVARCHAR(MAX)',
+    'int64': 'BIGINT',
+    'float64': 'FLOAT',
+    'datetime64[ns]': 'DATETIME',
+    'bool': 'BIT'
+}
+INTEGER_SQL_TYPES = ['BIT', 'INT', 'BIGINT']    # ordered narrowest to widest
+INTEGER_DIGITS = {'BIT': 1, 'INT': 10, 'BIGINT': 19}
+
+def sql_type_for(dtype):
+    return SQL_TYPES.get(str(dtype), 'NVARCHAR(MAX)')
+
+def parse_sql_type(sql_type):
+    name, _, args = sql_type.partition('(')
+    return name, [arg.strip() for arg in args.rstrip(')').split(',')] if args else []
+
+def widen_sql_type(current, new):
+    if current == new:
+        return current
+    a, a_args = parse_sql_type(current)
+    b, b_args = parse_sql_type(new)
+
+    if a == b == 'NVARCHAR':
+        if 'MAX' in (a_args[0], b_args[0]):
+            return 'NVARCHAR(MAX)'
+        return f'NVARCHAR({max(int(a_args[0]), int(b_args[0]))})'
+    if a in INTEGER_SQL_TYPES and b in INTEGER_SQL_TYPES:
+        return max(a, b, key=INTEGER_SQL_TYPES.index)
+
+    numeric = INTEGER_SQL_TYPES + ['DECIMAL', 'FLOAT']
+    if a in numeric and b in numeric:
+        if 'FLOAT' in (a, b):
+            return 'FLOAT'
+        digits = [INTEGER_DIGITS[t] if t in INTEGER_DIGITS else int(args[0]) - int(args[1])
+                  for t, args in ((a, a_args), (b, b_args))]
+        scales = [0 if t in INTEGER_DIGITS else int(args[1]) for t, args in ((a, a_args), (b, b_args))]
+        return decimal_or_float(max(digits), max(scales))
+    if {a, b} == {'DATE', 'DATETIME'}:
+        return 'DATETIME'
+    if 'NVARCHAR' in (a, b):
+        # Numbers and dates need at most a few dozen characters once converted
+        length = a_args[0] if a == 'NVARCHAR' else b_args[0]
+        return 'NVARCHAR(MAX)' if length == 'MAX' else nvarchar_type(max(int(length), 64))
+    return 'NVARCHAR(MAX)'
+
+NUMERIC_SQL_TYPES = ('INT', 'BIGINT', 'DECIMAL', 'FLOAT')
+
+def widening_keeps_values(current, wider):
+    # ALTER COLUMN converts stored values: BIT from "yes"/"no" would read 1/0 and dates would
+    # turn into ISO text, so only numeric and DATE -> DATETIME widening keeps what was loaded
+    a, b = parse_sql_type(current)[0], parse_sql_type(wider)[0]
+    return a == b or (a, b) == ('DATE', 'DATETIME') or (a in NUMERIC_SQL_TYPES and b in NUMERIC_SQL_TYPES)
+
+class ColumnNeedsText(Exception):
+    def __init__(self, column):
+        super().__init__(column)
+        self.column = column
+
+def widen_loaded(column, current, new):
+    # Both the rows already converted and the new chunk must survive the wider type
+    wider = widen_sql_type(current, new)
+    if not (widening_keeps_values(current, wider) and widening_keeps_values(new, wider)):
+        raise ColumnNeedsText(column)
+    return wider
+
 def create_table(cursor, table_name, columns, dtypes):
-    sql_types = {
-        'object': 'NVARCHAR(MAX)',
-        'int64': 'BIGINT',
-        'float64': 'FLOAT',
-        'datetime64[ns]': 'DATETIME',
-        'bool': 'BIT'
-    }
-    defs = [f"[{col}] {sql_types.get(str(dtype), 'NVARCHAR(MAX)')}" for col, dtype in zip(columns, dtypes)]
+    create_table_from_types(cursor, table_name, columns, [sql_type_for(dtype) for dtype in dtypes])
+
+def create_table_from_types(cursor, table_name, columns, sql_types):
+    defs = [f"[{col}] {sql_type}" for col, sql_type in zip(columns, sql_types)]
     cursor.execute(f"CREATE TABLE [{table_name}] ({', '.join(defs)})")
 
-def insert_data(cursor, table_name, columns, data):
+def alter_column_type(cursor, table_name, column, sql_type):
+    cursor.execute(f"ALTER TABLE [{table_name}] ALTER COLUMN [{column}] {sql_type}")
+
+def insert_data(cursor, table_name, columns, data, sql_types=None, strategy=None):
+    # sql_types is only passed when columns cover the whole table in table order
+    strategy = strategy or choose_load_strategy(len(data), sql_types)
+    started = time.perf_counter()
+    LOAD_STRATEGIES[strategy](cursor, table_name, columns, data, sql_types)
+    return LoadStats(strategy, len(data), time.perf_counter() - started)
+
+# --- Bulk Load Strategies ---
+class LoadStats:
+    def __init__(self, strategy, rows=0, seconds=0.0):
+        self.strategy = strategy
+        self.rows = rows
+        self.seconds = seconds
+
+    def add(self, other):
+        if other.strategy != self.strategy:
+            self.strategy = "mixed"
+        self.rows += other.rows
+        self.seconds += other.seconds
+        return self
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return f"{self.strategy}, {self.rows:,} rows at {self.rows_per_sec:,.0f} rows/s"
+
+def choose_load_strategy(row_count, sql_types):
+    # TVPs and BULK INSERT files need the column types of the whole table; partial
+    # column lists (such as upsert delete keys) always go through fast_executemany
+    if not sql_types:
+        return 'fast_executemany'
+    if LOAD_STRATEGY != 'auto':
+        return LOAD_STRATEGY
+    if BULK_INSERT_DIR and row_count >= BULK_FILE_MIN_ROWS:
+        return 'bulk_file'
+    # fast_executemany allocates a full-width buffer per NVARCHAR(MAX) value; TVPs stream them
+    if any(sql_type.endswith('(MAX)') for sql_type in sql_types):
+        return 'tvp'
+    return 'fast_executemany'
+
+def batch_rows(column_count):
+    return max(MIN_BATCH_ROWS, min(MAX_BATCH_ROWS, BATCH_TARGET_CELLS // max(column_count, 1)))
+
+def column_list(columns):
+    return ', '.join(f'[{col}]' for col in columns)
+
+def load_fast_executemany(cursor, table_name, columns, data, sql_types=None):
     placeholders = ', '.join(['?'] * len(columns))
-    cursor.executemany(
-        f"INSERT INTO [{table_name}] ({', '.join(f'[{col}]' for col in columns)}) VALUES ({placeholders})",
-        data
-    )
+    query = f"INSERT INTO [{table_name}] ({column_list(columns)}) VALUES ({placeholders})"
+    size = batch_rows(len(columns))
+    previous, cursor.fast_executemany = cursor.fast_executemany, True
+    try:
+        for start in range(0, len(data), size):
+            cursor.executemany(query, data[start:start + size])
+    finally:
+        cursor.fast_executemany = previous
+
+def load_tvp(cursor, table_name, columns, data, sql_types):
+    # The table type lives only for this load: it is created and dropped inside the caller's
+    # transaction (a rollback removes it too), so no types pile up in the user database and
+    # parallel writers never share one
+    defs = ', '.join(f"[{col}] {sql_type}" for col, sql_type in zip(columns, sql_types))
+    type_name = f"tvp_{uuid.uuid4().hex[:16]}"
+    cursor.execute(f"CREATE TYPE dbo.[{type_name}] AS TABLE ({defs})")
+    query = f"INSERT INTO [{table_name}] ({column_list(columns)}) SELECT {column_list(columns)} FROM ?"
+    size = batch_rows(len(columns))
+    for start in range(0, len(data), size):
+        cursor.execute(query, ([type_name, 'dbo'] + list(data[start:start + size]),))
+    cursor.execute(f"DROP TYPE dbo.[{type_name}]")
+
+def bulk_file_field(value):
+    # Quoted "" stays an empty string; an unquoted empty field loads as NULL
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, datetime.datetime):
+        # DATETIME takes at most three fractional digits
+        return value.strftime('%Y-%m-%d %H:%M:%S.') + f"{value.microsecond // 1000:03d}"
+    if isinstance(value, float):
+        value = Decimal(repr(value))   # positional digits: DECIMAL columns reject 1e-05
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return str(value)
+
+def load_bulk_file(cursor, table_name, columns, data, sql_types=None):
+    # BULK INSERT runs inside our transaction, so the server must be able to read BULK_INSERT_DIR
+    fd, path = tempfile.mkstemp(suffix=".csv", dir=BULK_INSERT_DIR)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            for row in data:
+                f.write(','.join(bulk_file_field(value) for value in row) + '\n')
+        cursor.execute(f"""
+        BULK INSERT [{table_name}] FROM '{path}'
+        WITH (FORMAT = 'CSV', FIELDQUOTE = '"', ROWTERMINATOR = '0x0a', CODEPAGE = '65001',
+              KEEPNULLS, TABLOCK, BATCHSIZE = {batch_rows(len(columns))})
+        """)
+    finally:
+        os.remove(path)
+
+LOAD_STRATEGIES = {
+    'fast_executemany': load_fast_executemany,
+    'tvp': load_tvp,
+    'bulk_file': load_bulk_file,
+}
 
 def insert_metadata(cursor, table_name, col_count, row_count):
     cursor.execute("""
@@ -97,6 +472,269 @@ def insert_metadata(cursor, table_name, col_count, row_count):
         INSERT INTO table_information (table_name, column_count, row_count) VALUES (?, ?, ?)
     """, (table_name, col_count, row_count, table_name, table_name, col_count, row_count))
 
+def delete_metadata(cursor, table_name):
+    cursor.execute("DELETE FROM table_information WHERE table_name = ?", (table_name,))
+
+# --- Ingest Metrics ---
+class IngestMetrics:
+    """Stage timings, sizes and memory for one file's ingest, stored in ingest_history.
+
+    peak_mem_mb is how far the process's resident size grew above where it stood when the
+    file's first stage began, sampled at every stage end (so once per streamed chunk).
+    """
+
+    STAGES = ('read', 'clean', 'create', 'insert')
+
+    def __init__(self, cycle_id=None, file_name=None, table_name=None):
+        self.cycle_id = cycle_id
+        self.file_name = file_name
+        self.table_name = table_name
+        self.started_at = datetime.datetime.now()
+        self.timings = dict.fromkeys(self.STAGES, 0.0)
+        self.bytes_read = 0
+        self.rows = 0
+        self.peak_mem_mb = None
+        self.base_mem_mb = None
+        self.error = None
+
+    @contextmanager
+    def stage(self, name):
+        # Time recorded by stages nested inside (e.g. a chunk generator consumed by the
+        # upsert) belongs to those stages only, so nothing is counted twice
+        if self.base_mem_mb is None:
+            self.base_mem_mb = current_memory_mb()
+        started, nested = time.perf_counter(), self.total
+        try:
+            yield
+        finally:
+            nested = self.total - nested
+            self.timings[name] += time.perf_counter() - started - nested
+            self.sample_memory()
+
+    def sample_memory(self):
+        current = current_memory_mb()
+        if current is None or self.base_mem_mb is None:
+            return
+        growth = max(current - self.base_mem_mb, 0.0)
+        if self.peak_mem_mb is None or growth > self.peak_mem_mb:
+            self.peak_mem_mb = growth
+
+    def merge(self, timings, peak_mem_mb):
+        # Folds in the stages measured by a parse worker process
+        for name, seconds in timings.items():
+            self.timings[name] += seconds
+        if peak_mem_mb is not None:
+            self.peak_mem_mb = max(self.peak_mem_mb or 0.0, peak_mem_mb)
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.total if self.total else 0.0
+
+    @property
+    def slowest_stage(self):
+        return max(self.timings, key=self.timings.get)
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [('cb', ctypes.c_ulong), ('PageFaultCount', ctypes.c_ulong)] + [
+        (name, ctypes.c_size_t) for name in (
+            'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+            'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+def current_memory_mb():
+    # Resident size of this process right now: psutil if installed, else /proc or the Windows working set
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    counters = process_memory_counters()
+    return counters.WorkingSetSize / (1024 * 1024) if counters else None
+
+def process_memory_counters():
+    # Windows only; None elsewhere or if the call fails
+    try:
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters
+    except (AttributeError, OSError):
+        pass
+    return None
+
+def peak_memory_mb():
+    # Peak RSS over the whole life of this process (ru_maxrss / PeakWorkingSetSize); only
+    # meaningful per run in a fresh process, e.g. a benchmark case
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    counters = process_memory_counters()
+    return counters.PeakWorkingSetSize / (1024 * 1024) if counters else None
+
+def timed_iter(iterable, metrics, stage):
+    iterator = iter(iterable)
+    while True:
+        with metrics.stage(stage):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+def create_ingest_history_table(cursor):
+    cursor.execute("""
+    IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='ingest_history' and xtype='U')
+    BEGIN
+        CREATE TABLE ingest_history (
+            id INT IDENTITY(1,1) PRIMARY KEY,
+            cycle_id CHAR(32) NOT NULL,
+            file_name NVARCHAR(255) NOT NULL,
+            table_name NVARCHAR(255) NOT NULL,
+            started_at DATETIME NOT NULL,
+            read_s FLOAT NOT NULL,
+            clean_s FLOAT NOT NULL,
+            create_s FLOAT NOT NULL,
+            insert_s FLOAT NOT NULL,
+            total_s FLOAT NOT NULL,
+            bytes_read BIGINT NOT NULL,
+            row_count BIGINT NOT NULL,
+            rows_per_sec FLOAT NOT NULL,
+            peak_mem_mb FLOAT NULL,
+            status NVARCHAR(10) NOT NULL,
+            error NVARCHAR(MAX) NULL
+        );
+        CREATE INDEX IX_ingest_history_cycle ON ingest_history (cycle_id);
+        CREATE INDEX IX_ingest_history_total ON ingest_history (total_s DESC);
+    END
+    """)
+
+def insert_ingest_history(cursor, metrics):
+    t = metrics.timings
+    cursor.execute("""
+    INSERT INTO ingest_history (cycle_id, file_name, table_name, started_at, read_s, clean_s, create_s, insert_s,
+                                total_s, bytes_read, row_count, rows_per_sec, peak_mem_mb, status, error)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (metrics.cycle_id, metrics.file_name, metrics.table_name, metrics.started_at,
+          t['read'], t['clean'], t['create'], t['insert'], metrics.total, metrics.bytes_read,
+          metrics.rows, metrics.rows_per_sec, metrics.peak_mem_mb,
+          'ok' if metrics.error is None else 'error', None if metrics.error is None else str(metrics.error)))
+
+def slowest_files(cursor, limit=SLOWEST_FILES_LIMIT):
+    cursor.execute("""
+    SELECT TOP (?) file_name, table_name, started_at, total_s, read_s, clean_s, create_s, insert_s,
+           row_count, rows_per_sec, peak_mem_mb
+    FROM ingest_history WHERE status = 'ok' ORDER BY total_s DESC
+    """, (limit,))
+    return cursor.fetchall()
+
+def log_cycle_summary(log_box, cycle_id, metrics_list):
+    if not metrics_list:
+        return
+    ok = [m for m in metrics_list if m.error is None]
+    rows = sum(m.rows for m in ok)
+    seconds = sum(m.total for m in metrics_list)
+    log_box.insert(tk.END, f"[Σ] Cycle {cycle_id[:8]}: {len(ok)}/{len(metrics_list)} file(s), "
+                           f"{rows:,} rows, {seconds:.2f}s of ingest work.\n")
+    slowest = max(metrics_list, key=lambda m: m.total)
+    log_box.insert(tk.END, f"    Slowest: {slowest.file_name} ({slowest.total:.2f}s, mostly {slowest.slowest_stage}: "
+                           f"{slowest.timings[slowest.slowest_stage]:.2f}s)\n")
+
+# --- File Manifest (change detection) ---
+def create_file_manifest_table(cursor):
+    cursor.execute("""
+    IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='file_manifest' and xtype='U')
+    CREATE TABLE file_manifest (
+        file_name NVARCHAR(255) NOT NULL PRIMARY KEY,
+        table_name NVARCHAR(255) NOT NULL,
+        file_size BIGINT NOT NULL,
+        file_mtime FLOAT NOT NULL,
+        content_hash CHAR(64) NOT NULL,
+        synced_at DATETIME NOT NULL DEFAULT GETDATE()
+    )
+    """)
+
+def load_manifest(cursor):
+    cursor.execute("SELECT file_name, table_name, file_size, file_mtime, content_hash FROM file_manifest")
+    return {row[0]: {'table_name': row[1], 'size': row[2], 'mtime': row[3], 'hash': row[4]}
+            for row in cursor.fetchall()}
+
+def update_manifest(cursor, file_name, table_name, size, mtime, content_hash):
+    cursor.execute("""
+    IF EXISTS (SELECT * FROM file_manifest WHERE file_name = ?)
+        UPDATE file_manifest SET table_name = ?, file_size = ?, file_mtime = ?, content_hash = ?, synced_at = GETDATE()
+        WHERE file_name = ?
+    ELSE
+        INSERT INTO file_manifest (file_name, table_name, file_size, file_mtime, content_hash) VALUES (?, ?, ?, ?, ?)
+    """, (file_name, table_name, size, mtime, content_hash, file_name,
+          file_name, table_name, size, mtime, content_hash))
+
+def delete_manifest(cursor, file_name):
+    cursor.execute("DELETE FROM file_manifest WHERE file_name = ?", (file_name,))
+
+def existing_tables(cursor):
+    cursor.execute("SELECT name FROM sys.tables")
+    return {row[0] for row in cursor.fetchall()}
+
+def file_content_hash(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def is_supported_file(name):
+    # "~$book.xlsx" is the lock file Excel keeps next to an open workbook
+    return name.lower().endswith(SUPPORTED_EXTENSIONS) and not name.startswith("~$")
+
+def scan_folder(only=None):
+    files = {}
+    if only is not None:
+        for name in only:
+            try:
+                stat = os.stat(os.path.join(FOLDER_PATH, name))
+            except FileNotFoundError:
+                continue
+            files[name] = (stat.st_size, stat.st_mtime)
+        return files
+
+    for entry in os.scandir(FOLDER_PATH):
+        if entry.is_file() and is_supported_file(entry.name):
+            stat = entry.stat()
+            files[entry.name] = (stat.st_size, stat.st_mtime)
+    return files
+
+def detect_changes(cursor, manifest, files):
+    # Size/mtime are compared first; the file is only hashed when they differ.
+    tables = existing_tables(cursor)
+    changed = []
+    for file, (size, mtime) in files.items():
+        table_name = os.path.splitext(file)[0]
+        entry = manifest.get(file)
+        if entry and table_name in tables:
+            if entry['size'] == size and entry['mtime'] == mtime:
+                continue
+            content_hash = file_content_hash(os.path.join(FOLDER_PATH, file))
+            if entry['hash'] == content_hash:
+                update_manifest(cursor, file, table_name, size, mtime, content_hash)
+                continue
+        else:
+            content_hash = file_content_hash(os.path.join(FOLDER_PATH, file))
+        changed.append((file, table_name, size, mtime, content_hash))
+
+    removed = [(file, entry['table_name']) for file, entry in manifest.items() if file not in files]
+    return changed, removed
+
 def read_file(file_path):
     if file_path.endswith(".csv"):
         return pd.read_csv(file_path)
@@ -105,48 +743,733 @@ def read_file(file_path):
     else:
         raise ValueError("Unsupported file format.")
 
-# --- File Processing Logic ---
-def process_files(log_box):
+def excel_headers(values):
+    # Header names as pd.read_excel gives them: blanks become "Unnamed: i" and repeats get ".1",
+    # ".2" (named columns first, skipping suffixes another header already uses)
+    headers = ["" if value is None else value for value in values]
+    unnamed = [i for i, name in enumerate(headers) if name == ""]
+    for i in unnamed:
+        headers[i] = f"Unnamed: {i}"
+    counts = {}
+    for i in [i for i in range(len(headers)) if i not in unnamed] + unnamed:
+        name = original = headers[i]
+        count = counts.get(name, 0)
+        while count:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in headers else counts.get(name, 0)
+        headers[i] = name
+        counts[name] = count + 1
+    return headers
+
+def iter_file_chunks(file_path, chunk_size=CHUNK_SIZE):
+    lower = file_path.lower()
+    if lower.endswith(".csv"):
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+    elif lower.endswith(('.xlsx', '.xls')):
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            # The first sheet and pandas-style headers, so the schema matches what read_file gives
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = excel_headers(header)
+            width, batch = len(header), []
+            for row in rows:
+                batch.append(row[:width])
+                if len(batch) == chunk_size:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError("Unsupported file format.")
+
+def clean_chunk(chunk):
+    chunk = validate_and_clean_data(chunk)
+    return clean_large_ints(chunk)
+
+def clean_chunks(file_path, metrics, chunk_size=CHUNK_SIZE):
+    for chunk in timed_iter(iter_file_chunks(file_path, chunk_size), metrics, 'read'):
+        with metrics.stage('clean'):
+            chunk = clean_chunk(chunk)
+        yield chunk
+
+def stream_file(cursor, file_path, table_name, chunk_size=CHUNK_SIZE, metrics=None):
+    # Only TYPE_SAMPLE_CHUNKS chunks are ever held at once; columns are widened
+    # with ALTER TABLE if a later chunk does not fit the types chosen up front.
+    # A column whose loaded values a wider type would rewrite is reloaded as text.
+    metrics = metrics or IngestMetrics()
+    text_columns = set()
+    while True:
+        try:
+            return stream_typed(cursor, file_path, table_name, chunk_size, metrics, frozenset(text_columns))
+        except ColumnNeedsText as needs:
+            text_columns.add(needs.column)
+
+def stream_typed(cursor, file_path, table_name, chunk_size, metrics, text_columns):
+    chunks = (infer_column_types(chunk, text_columns) for chunk in clean_chunks(file_path, metrics, chunk_size))
+    sample = []
+    for chunk in chunks:
+        sample.append(chunk)
+        if len(sample) == TYPE_SAMPLE_CHUNKS:
+            break
+    if not sample:
+        raise ValueError("File is empty.")
+
+    columns = sample[0][0].columns.tolist()
+    types = list(sample[0][1])
+    for _, chunk_types in sample[1:]:
+        types = [widen_loaded(col, t, new) for col, t, new in zip(columns, types, chunk_types)]
+
+    key = upsert_key_for(table_name, sample[0][0])
+    if key:
+        sample = [(with_row_hash(chunk), chunk_types + ['BIGINT']) for chunk, chunk_types in sample]
+        chunks = ((with_row_hash(chunk), chunk_types + ['BIGINT']) for chunk, chunk_types in chunks)
+        columns.append(ROW_HASH_COLUMN)
+        types.append('BIGINT')
+
+    with metrics.stage('create'):
+        if table_exists(cursor, table_name):
+            drop_table(cursor, table_name)
+        create_table_from_types(cursor, table_name, columns, types)
+
+    stats = LoadStats('fast_executemany')
+    with metrics.stage('insert'):
+        for chunk, _ in sample:
+            stats.add(insert_data(cursor, table_name, columns, frame_rows(chunk, types), types))
+    del sample
+
+    for chunk, chunk_types in chunks:
+        with metrics.stage('create'):
+            for i, (col, new) in enumerate(zip(columns, chunk_types)):
+                wider = widen_loaded(col, types[i], new)
+                if wider != types[i]:
+                    alter_column_type(cursor, table_name, col, wider)
+                    types[i] = wider
+        with metrics.stage('insert'):
+            stats.add(insert_data(cursor, table_name, columns, frame_rows(chunk, types), types))
+
+    if key:
+        with metrics.stage('create'):
+            create_key_index(cursor, table_name, key, types[columns.index(key)])
+        return len(columns) - 1, stats.rows, stats
+    return len(columns), stats.rows, stats
+
+def parse_file(file_path, metrics=None):
+    metrics = metrics or IngestMetrics()
+    with metrics.stage('read'):
+        df = read_file(file_path)
+    with metrics.stage('clean'):
+        df = validate_and_clean_data(df)
+        df = clean_large_ints(df)
+        df, _ = infer_column_types(df)
+    return df
+
+def parse_file_timed(file_path, content_hash=None):
+    # Runs in a worker process when PARALLEL_INGEST is on, so it must stay picklable
+    metrics = IngestMetrics()
+    df = parse_file_cached(file_path, content_hash, metrics)
+    return df, metrics.timings, metrics.peak_mem_mb
+
+# --- Parsed File Cache ---
+def parse_cache_prefix(file_path):
+    return hashlib.sha256(os.path.abspath(file_path).lower().encode('utf-8')).hexdigest()[:16]
+
+def parse_cache_path(file_path, content_hash):
+    return os.path.join(PARSE_CACHE_DIR, f"{parse_cache_prefix(file_path)}_v{PARSE_CACHE_VERSION}_"
+                                         f"{content_hash[:32]}.parquet")
+
+def parse_cache_get(file_path, content_hash):
+    path = parse_cache_path(file_path, content_hash)
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        create_table_information_table(cursor)
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        os.utime(path)   # mtime doubles as the LRU clock
+    except (OSError, ValueError):
+        return None
+    df = table.to_pandas()
+    df.attrs['sql_types'] = json.loads((table.schema.metadata or {}).get(b'sperene_sql_types', b'{}'))
+    return df
+
+def parse_cache_put(file_path, content_hash, df):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+    prefix = parse_cache_prefix(file_path)
+    path = parse_cache_path(file_path, content_hash)
+    for name in os.listdir(PARSE_CACHE_DIR):
+        # Older versions of the same file can never be hit again
+        if name.startswith(prefix + "_") and os.path.join(PARSE_CACHE_DIR, name) != path:
+            remove_quietly(os.path.join(PARSE_CACHE_DIR, name))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'sperene_sql_types'] = json.dumps(df.attrs.get('sql_types', {})).encode('utf-8')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+    os.replace(tmp_path, path)
+    evict_parse_cache()
 
-        for file in os.listdir(FOLDER_PATH):
-            if not file.lower().endswith((".csv", ".xlsx", ".xls")):
+def evict_parse_cache(max_bytes=PARSE_CACHE_MAX_BYTES):
+    entries = []
+    for entry in os.scandir(PARSE_CACHE_DIR):
+        if entry.name.endswith(".parquet"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
                 continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_quietly(path)
+        total -= size
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def uses_parse_cache(file_path):
+    return PARSE_CACHE_ENABLED and file_path.lower().endswith(PARSE_CACHE_EXTENSIONS)
+
+def parse_file_cached(file_path, content_hash=None, metrics=None):
+    # Skips the openpyxl parse when a cleaned copy of this exact file content is cached
+    metrics = metrics or IngestMetrics()
+    if not uses_parse_cache(file_path):
+        return parse_file(file_path, metrics)
+
+    content_hash = content_hash or file_content_hash(file_path)
+    with metrics.stage('read'):
+        df = parse_cache_get(file_path, content_hash)
+    if df is not None:
+        return df
+    return parse_file(file_path, metrics)
+
+def keep_parsed(file_path, content_hash, df):
+    # Only a file whose write failed is cached: the manifest is not updated for it, so the
+    # next cycle retries the same content and can skip the parse. Successful files are
+    # skipped by the manifest and would never hit the cache.
+    if uses_parse_cache(file_path) and content_hash:
+        try:
+            parse_cache_put(file_path, content_hash, df)
+        except Exception:
+            pass   # a cache that cannot be written only costs the next parse
+
+def forget_parsed(file_path):
+    # Once a file is written, no cached version of it can be hit again
+    if uses_parse_cache(file_path) and os.path.isdir(PARSE_CACHE_DIR):
+        prefix = parse_cache_prefix(file_path) + "_"
+        for name in os.listdir(PARSE_CACHE_DIR):
+            if name.startswith(prefix):
+                remove_quietly(os.path.join(PARSE_CACHE_DIR, name))
+
+def write_frame(cursor, table_name, df, metrics=None):
+    metrics = metrics or IngestMetrics()
+    with metrics.stage('clean'):
+        df, types = infer_column_types(df)
+        key = upsert_key_for(table_name, df)
+        if key:
+            df = with_row_hash(df)
+            types = types + ['BIGINT']
+
+    columns, data = df.columns.tolist(), frame_rows(df, types)
+
+    with metrics.stage('create'):
+        if table_exists(cursor, table_name):
+            drop_table(cursor, table_name)
+        create_table_from_types(cursor, table_name, columns, types)
+    with metrics.stage('insert'):
+        stats = insert_data(cursor, table_name, columns, data, types)
+    if key:
+        with metrics.stage('create'):
+            create_key_index(cursor, table_name, key, types[columns.index(key)])
+        return len(columns) - 1, len(data), stats
+    return len(columns), len(data), stats
+
+# --- Row-Level Upsert ---
+class UpsertNotPossible(Exception):
+    pass
+
+INDEXABLE_NVARCHAR = 850    # longest NVARCHAR(n) that fits a 1700-byte index key
+
+def upsert_key_for(table_name, df):
+    if not UPSERT_SYNC:
+        return None
+    key = UPSERT_KEYS.get(table_name)
+    if key is None and INFER_UPSERT_KEYS and len(df.columns):
+        first = df[df.columns[0]]
+        # Unique the way the unique index will see it: the default collation ignores case and trailing spaces
+        folded = first.map(collation_key) if first.dtype == object else first
+        if folded.is_unique and not (first.isna() | (first.astype(str) == "")).any():
+            key = df.columns[0]
+    return key if key in df.columns else None
+
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).astype('int64')
+
+def with_row_hash(df):
+    return df.assign(**{ROW_HASH_COLUMN: row_hashes(df)})
+
+def create_key_index(cursor, table_name, key, sql_type):
+    # Long strings cannot be an index key; MERGE then falls back to a scan. Keys that turn out
+    # to repeat (a later chunk, or an UPSERT_KEYS column) leave the table without the index and
+    # the next sync reloads it in full.
+    name, args = parse_sql_type(sql_type)
+    if name != 'NVARCHAR' or (args[0] != 'MAX' and int(args[0]) <= INDEXABLE_NVARCHAR):
+        try:
+            cursor.execute(f"CREATE UNIQUE INDEX [UX_{table_name}_{key}] ON [{table_name}] ([{key}])")
+        except pyodbc.Error:
+            pass
+
+def collation_key(value):
+    # Equal here whenever SQL Server's default case-insensitive collation calls the strings equal
+    return value.rstrip().casefold() if isinstance(value, str) else value
+
+def key_value(value, sql_type):
+    # Keys come back from pyodbc as date/datetime/Decimal but from pandas as Timestamp/float
+    name = parse_sql_type(sql_type)[0]
+    if value is None:
+        return None
+    if name == 'DATE' and isinstance(value, datetime.datetime):
+        return value.date()
+    if name == 'DATETIME' and isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if name == 'DECIMAL' and not isinstance(value, Decimal):
+        return Decimal(repr(value))
+    return collation_key(value)
+
+def stored_sql_type(data_type, char_length, precision, scale):
+    data_type = data_type.upper()
+    if data_type == 'NVARCHAR':
+        return 'NVARCHAR(MAX)' if char_length == -1 else f'NVARCHAR({char_length})'
+    if data_type in ('DECIMAL', 'NUMERIC'):
+        return f'DECIMAL({precision},{scale})'
+    return data_type
+
+def stored_columns(cursor, table_name):
+    cursor.execute("""
+    SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
+    FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ? ORDER BY ORDINAL_POSITION
+    """, (table_name,))
+    return [(row[0], stored_sql_type(*row[1:])) for row in cursor.fetchall()]
+
+def upsert_chunks(cursor, table_name, chunks):
+    """Diff cleaned chunks against the stored row hashes and MERGE only the changed rows.
+
+    Returns (col_count, row_count, inserted, updated, deleted). Raises UpsertNotPossible
+    before the target table is touched when the file no longer fits the table: columns
+    are only widened once every chunk has been checked.
+    """
+    stored_cols = stored_columns(cursor, table_name)
+    if not stored_cols or stored_cols[-1][0] != ROW_HASH_COLUMN:
+        raise UpsertNotPossible("table has no row hash column")
+    stored_types = dict(stored_cols)
+
+    columns = key = None
+    stored, seen, widened = {}, set(), {}
+    inserted = updated = 0
+    for chunk in chunks:
+        chunk, chunk_types = infer_column_types(chunk)
+        if columns is None:
+            columns = chunk.columns.tolist()
+            if columns + [ROW_HASH_COLUMN] != [col for col, _ in stored_cols]:
+                raise UpsertNotPossible("columns changed")
+            key = upsert_key_for(table_name, chunk)
+            if key is None:
+                raise UpsertNotPossible("no usable key column")
+            cursor.execute(f"SELECT [{key}], [{ROW_HASH_COLUMN}] FROM [{table_name}]")
+            stored = {key_value(row[0], stored_types[key]): row[1] for row in cursor.fetchall()}
+            cursor.execute(f"DROP TABLE IF EXISTS [{UPSERT_STAGE_TABLE}]")
+            cursor.execute(f"SELECT TOP 0 *, CAST(NULL AS CHAR(1)) AS __op "
+                           f"INTO [{UPSERT_STAGE_TABLE}] FROM [{table_name}]")
+
+        for col, new in zip(columns, chunk_types):
+            wider = widen_sql_type(stored_types[col], new)
+            if not (widening_keeps_values(stored_types[col], wider) and widening_keeps_values(new, wider)):
+                raise UpsertNotPossible(f"column {col} changed type")
+            if wider != stored_types[col]:
+                if col == key:
+                    raise UpsertNotPossible(f"key column {col} needs a wider type")
+                alter_column_type(cursor, UPSERT_STAGE_TABLE, col, wider)
+                stored_types[col] = widened[col] = wider
+
+        hashes = row_hashes(chunk).tolist()
+        changed = []
+        keys = [key_value(value, stored_types[key]) for value in chunk[key].tolist()]
+        for pos, (value, row_hash) in enumerate(zip(keys, hashes)):
+            if value in seen:
+                raise UpsertNotPossible(f"duplicate key {value!r}")
+            seen.add(value)
+            old_hash = stored.get(value)
+            if old_hash == row_hash:
+                continue
+            if old_hash is None:
+                inserted += 1
+            else:
+                updated += 1
+            changed.append(pos)
+
+        if changed:
+            staged = chunk.iloc[changed].assign(**{ROW_HASH_COLUMN: [hashes[pos] for pos in changed], '__op': 'U'})
+            stage_types = [stored_types[col] for col in columns] + ['BIGINT', 'CHAR(1)']
+            insert_data(cursor, UPSERT_STAGE_TABLE, staged.columns.tolist(), frame_rows(staged, stage_types),
+                        stage_types)
+
+    if columns is None:
+        raise UpsertNotPossible("file is empty")
 
-            path = os.path.join(FOLDER_PATH, file)
-            table_name = os.path.splitext(file)[0]
+    for col, wider in widened.items():
+        alter_column_type(cursor, table_name, col, wider)
+    deleted = [value for value in stored if value not in seen]
+    if deleted:
+        insert_data(cursor, UPSERT_STAGE_TABLE, [key, '__op'], [(value, 'D') for value in deleted])
 
+    if inserted or updated or deleted:
+        targets = columns + [ROW_HASH_COLUMN]
+        assignments = ', '.join(f"target.[{col}] = source.[{col}]" for col in targets if col != key)
+        cursor.execute(f"""
+        MERGE [{table_name}] AS target
+        USING (SELECT * FROM [{UPSERT_STAGE_TABLE}] AS s
+               WHERE s.__op = 'U' OR NOT EXISTS (SELECT 1 FROM [{UPSERT_STAGE_TABLE}] AS u
+                                                 WHERE u.__op = 'U' AND u.[{key}] = s.[{key}])) AS source
+           ON target.[{key}] = source.[{key}]
+        WHEN MATCHED AND source.__op = 'D' THEN DELETE
+        WHEN MATCHED THEN UPDATE SET {assignments}
+        WHEN NOT MATCHED BY TARGET AND source.__op = 'U' THEN
+            INSERT ({', '.join(f'[{col}]' for col in targets)})
+            VALUES ({', '.join(f'source.[{col}]' for col in targets)});
+        """)
+    cursor.execute(f"DROP TABLE IF EXISTS [{UPSERT_STAGE_TABLE}]")
+    return len(columns), len(seen), inserted, updated, len(deleted)
+
+def sync_file(cursor, file, table_name, size, mtime, content_hash, df=None, metrics=None):
+    # Returns a short note for the log (merge counts or load throughput)
+    metrics = metrics or IngestMetrics(file_name=file, table_name=table_name)
+    metrics.bytes_read = size
+    path = os.path.join(FOLDER_PATH, file)
+    streamed = df is None and os.path.getsize(path) >= STREAMING_MIN_BYTES
+    if df is None and not streamed:
+        df = parse_file_cached(path, content_hash, metrics)
+
+    try:
+        note, counts = "", None
+        if UPSERT_SYNC and table_exists(cursor, table_name):
+            chunks = clean_chunks(path, metrics) if streamed else [df]
             try:
-                df = read_file(path)
-                df = validate_and_clean_data(df)
-                df = clean_large_ints(df)
+                with metrics.stage('insert'):
+                    col_count, row_count, inserted, updated, deleted = upsert_chunks(cursor, table_name, chunks)
+                counts = col_count, row_count
+                note = f" (merged: +{inserted} ~{updated} -{deleted})"
+            except UpsertNotPossible:
+                cursor.execute(f"DROP TABLE IF EXISTS [{UPSERT_STAGE_TABLE}]")
+
+        if counts is None:
+            col_count, row_count, stats = (stream_file(cursor, path, table_name, metrics=metrics) if streamed
+                                           else write_frame(cursor, table_name, df, metrics))
+            counts = col_count, row_count
+            note = f" ({stats})"
+    except Exception:
+        if df is not None:
+            keep_parsed(path, content_hash, df)
+        raise
+    forget_parsed(path)
+
+    metrics.rows = counts[1]
+    insert_metadata(cursor, table_name, *counts)
+    update_manifest(cursor, file, table_name, size, mtime, content_hash)
+    return note
+
+# --- Parallel Ingest ---
+class WriterPool:
+    """Thread pool for database writes; every worker thread owns one connection."""
+
+    def __init__(self, workers=DB_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-writer")
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
 
-                columns, dtypes, data = df.columns.tolist(), df.dtypes.tolist(), df.values.tolist()
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = get_connection()
+            with self.lock:
+                self.connections.append(conn)
+        return conn
 
-                if table_exists(cursor, table_name):
-                    drop_table(cursor, table_name)
+    def submit(self, task, metrics, df=None):
+        return self.executor.submit(self.write, task, metrics, df)
 
-                create_table(cursor, table_name, columns, dtypes)
-                insert_data(cursor, table_name, columns, data)
-                insert_metadata(cursor, table_name, len(columns), len(data))
+    def write(self, task, metrics, df):
+        # One commit per file; a failure only rolls back that file
+        conn = self.connection()
+        cursor = conn.cursor()
+        try:
+            note = sync_file(cursor, *task, df=df, metrics=metrics)
+            insert_ingest_history(cursor, metrics)
+            conn.commit()
+            return task[0], task[1], None, note
+        except Exception as e:
+            conn.rollback()
+            record_failure(cursor, metrics, e)
+            conn.commit()
+            return task[0], task[1], e, ""
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for conn in self.connections:
+            conn.close()
+
+def log_result(log_box, file, table_name, error, note=""):
+    if error is None:
+        log_box.insert(tk.END, f"[✓] {file} ➜ {table_name} updated{note}.\n")
+    else:
+        log_box.insert(tk.END, f"[✗] Error with {file}: {error}\n")
 
-                log_box.insert(tk.END, f"[✓] {file} ➜ {table_name} updated.\n")
+def record_failure(cursor, metrics, error):
+    metrics.error = error
+    try:
+        insert_ingest_history(cursor, metrics)
+    except Exception:
+        pass
+
+def process_changed_parallel(log_box, changed, metrics_by_file, history_cursor):
+    writers = WriterPool(DB_WORKERS)
+    write_futures = []
+    try:
+        with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parsers:
+            parse_futures = {}
+            for task in changed:
+                path = os.path.join(FOLDER_PATH, task[0])
+                metrics = metrics_by_file[task[0]]
+                if os.path.getsize(path) >= STREAMING_MIN_BYTES:
+                    # Large files are streamed by the writer itself instead of being pickled across
+                    write_futures.append(writers.submit(task, metrics))
+                else:
+                    parse_futures[parsers.submit(parse_file_timed, path, task[4])] = task
+
+            for future in as_completed(parse_futures):
+                task = parse_futures[future]
+                metrics = metrics_by_file[task[0]]
+                try:
+                    df, timings, peak_mem_mb = future.result()
+                    metrics.merge(timings, peak_mem_mb)
+                    write_futures.append(writers.submit(task, metrics, df))
+                except Exception as e:
+                    record_failure(history_cursor, metrics, e)
+                    log_result(log_box, task[0], task[1], e)
+
+        for future in as_completed(write_futures):
+            log_result(log_box, *future.result())
+    finally:
+        writers.close()
+
+# --- File Processing Logic ---
+def process_files(log_box, only=None):
+    # only: optional set of file names (e.g. from the watcher); None rescans the whole folder
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        create_table_information_table(cursor)
+        create_file_manifest_table(cursor)
+        create_ingest_history_table(cursor)
+        cycle_id = uuid.uuid4().hex
+
+        manifest = load_manifest(cursor)
+        if only is not None:
+            manifest = {file: entry for file, entry in manifest.items() if file in only}
+        changed, removed = detect_changes(cursor, manifest, scan_folder(only))
+
+        for file, table_name in removed:
+            try:
+                drop_table(cursor, table_name)
+                delete_metadata(cursor, table_name)
+                delete_manifest(cursor, file)
+                log_box.insert(tk.END, f"[-] {file} removed ➜ {table_name} dropped.\n")
             except Exception as e:
-                log_box.insert(tk.END, f"[✗] Error with {file}: {e}\n")
+                log_box.insert(tk.END, f"[✗] Error removing {table_name}: {e}\n")
+
+        metrics_by_file = {task[0]: IngestMetrics(cycle_id, task[0], task[1]) for task in changed}
+        conn.commit()
+        if PARALLEL_INGEST and len(changed) > 1:
+            process_changed_parallel(log_box, changed, metrics_by_file, cursor)
+        else:
+            # One commit per file, as in WriterPool.write; a failure only rolls back that file
+            for task in changed:
+                metrics = metrics_by_file[task[0]]
+                try:
+                    note = sync_file(cursor, *task, metrics=metrics)
+                    insert_ingest_history(cursor, metrics)
+                    conn.commit()
+                    log_result(log_box, task[0], task[1], None, note)
+                except Exception as e:
+                    conn.rollback()
+                    record_failure(cursor, metrics, e)
+                    conn.commit()
+                    log_result(log_box, task[0], task[1], e)
+        log_cycle_summary(log_box, cycle_id, list(metrics_by_file.values()))
+
+        if not changed and not removed:
+            log_box.insert(tk.END, "[=] No changes detected.\n")
 
         conn.commit()
         conn.close()
     except Exception as e:
         log_box.insert(tk.END, f"!! Error: {e}\n")
 
+# --- Folder Watcher ---
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x002, 0x008, 0x040, 0x080
+IN_CREATE, IN_DELETE = 0x100, 0x200
+IN_Q_OVERFLOW = 0x4000    # the kernel dropped events; always delivered, no file name
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class FolderWatcher:
+    """Watches a folder and calls on_change(file_names) once a burst of writes has settled.
+
+    Uses Linux inotify when available and falls back to polling the directory listing.
+    A file is only handed over when its size and mtime are unchanged for WATCH_DEBOUNCE
+    seconds, so half-written copies are never ingested.
+    """
+
+    def __init__(self, folder, on_change, debounce=WATCH_DEBOUNCE, poll_interval=POLL_INTERVAL):
+        self.folder = folder
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.pending = {}
+        self.stop_event = threading.Event()
+        self.wake_w = None
+        self.libc = self.load_libc()
+        self.mode = "inotify" if self.libc else "polling"
+
+    @staticmethod
+    def load_libc():
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            libc.inotify_init1, libc.inotify_add_watch
+            return libc
+        except (OSError, AttributeError):
+            return None
+
+    def run(self, on_ready=None):
+        # on_ready runs once the watch is in place (e.g. the initial sync), so nothing
+        # that changes while it runs is missed
+        if self.libc:
+            self.run_inotify(on_ready)
+        else:
+            self.run_polling(on_ready)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.wake_w is not None:
+            try:
+                os.write(self.wake_w, b"x")
+            except OSError:
+                pass
+
+    def mark(self, name):
+        if is_supported_file(name):
+            self.pending[name] = {'due': time.monotonic() + self.debounce, 'stat': self.file_stat(name)}
+
+    def file_stat(self, name):
+        try:
+            stat = os.stat(os.path.join(self.folder, name))
+            return stat.st_size, stat.st_mtime
+        except FileNotFoundError:
+            return None
+
+    def flush_ready(self):
+        # Returns seconds until the next pending file is due, or None if nothing is pending
+        now = time.monotonic()
+        ready = set()
+        for name, entry in list(self.pending.items()):
+            if entry['due'] > now:
+                continue
+            stat = self.file_stat(name)
+            if stat is not None and stat != entry['stat']:
+                entry['stat'], entry['due'] = stat, now + self.debounce
+                continue
+            ready.add(name)
+            del self.pending[name]
+        if ready:
+            self.on_change(ready)
+        if not self.pending:
+            return None
+        return max(0.0, min(entry['due'] for entry in self.pending.values()) - time.monotonic())
+
+    def run_inotify(self, on_ready=None):
+        fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0 or self.libc.inotify_add_watch(fd, os.fsencode(self.folder), INOTIFY_MASK) < 0:
+            if fd >= 0:
+                os.close(fd)
+            self.mode = "polling"
+            return self.run_polling(on_ready)
+        if on_ready:
+            on_ready()   # events meanwhile queue up in the kernel and are read below
+
+        # The pipe lets stop() wake the blocking select immediately
+        wake_r, self.wake_w = os.pipe()
+        try:
+            while not self.stop_event.is_set():
+                timeout = self.flush_ready()
+                readable, _, _ = select.select([fd, wake_r], [], [], timeout)
+                if fd in readable:
+                    self.read_events(fd)
+        finally:
+            os.close(fd)
+            os.close(wake_r)
+            os.close(self.wake_w)
+            self.wake_w = None
+
+    def read_events(self, fd):
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                for file in scan_folder():
+                    self.mark(file)
+            elif name:
+                self.mark(os.fsdecode(name))
+
+    def run_polling(self, on_ready=None):
+        snapshot = scan_folder()
+        if on_ready:
+            on_ready()   # compared against the snapshot taken before it ran
+        while not self.stop_event.is_set():
+            timeout = self.flush_ready()
+            wait = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+            if self.stop_event.wait(wait):
+                break
+            current = scan_folder()
+            for name in set(snapshot) | set(current):
+                if snapshot.get(name) != current.get(name):
+                    self.mark(name)
+            snapshot = current
+
 # --- GUI Setup ---
 class FolderToDBApp:
     def __init__(self, root):
         self.running = False
         self.thread = None
+        self.watcher = None
 
         root.title("Folder to Database Uploader")
         root.geometry("780x580")
@@ -159,7 +1482,7 @@ class FolderToDBApp:
         # Description
         tk.Label(root,
                  text="FROM GIVEN FOLDER PATH IT WILL EXTRACT FILE EXTENSIONS AS XLSX & CSV AND SAVE THEM DYNAMICALLY TO THE DATABASE\n"
-                      "ALSO IT WILL USE TIME DURATION OF 30 SEC TO ITERATE THE SAME PROCEDURE.\n"
+                      "AFTER THE INITIAL SYNC IT WATCHES THE FOLDER AND ONLY RELOADS FILES THAT WERE ADDED, CHANGED OR DELETED.\n"
                       "IF IN ANY CASE THEY ARE SOME CHANGES THEY WILL GET UPDATED AUTOMATICALLY.",
                  bg="#f0f8ff", fg="#222", font=("Times New Roman", 10), justify="center", wraplength=750).pack(pady=5)
 
@@ -186,6 +1509,10 @@ class FolderToDBApp:
                                   fg="white", font=("Times New Roman", 12, "bold"), width=15)
         self.stop_btn.grid(row=0, column=1, padx=10)
 
+        self.slow_btn = tk.Button(btn_frame, text="Slowest Files", command=self.show_slowest_files, bg="#708090",
+                                  fg="white", font=("Times New Roman", 12, "bold"), width=15)
+        self.slow_btn.grid(row=0, column=2, padx=10)
+
     def start_loop(self):
         if not self.running:
             self.running = True
@@ -195,22 +1522,51 @@ class FolderToDBApp:
             self.thread.start()
 
     def initial_and_loop(self):
-        # First process immediately
+        # The watch is set up first and the initial sync runs inside it, so files changed
+        # during a long initial sync are picked up right after it; then wait for folder events
+        self.watcher = FolderWatcher(FOLDER_PATH, self.on_folder_change)
+        if self.running:
+            self.watcher.run(on_ready=self.initial_sync)
+
+    def initial_sync(self):
         self.timer_var.set("🔄 Initial sync in progress...")
         process_files(self.log_box)
         self.log_box.insert(tk.END, "-" * 60 + "\n")
-        # Then start timer loop
-        while self.running:
-            for i in range(30, 0, -1):
-                self.timer_var.set(f"⏳ Next sync in: {i}s")
-                time.sleep(1)
-            self.timer_var.set("🔄 Syncing now...")
-            self.log_box.insert(tk.END, f"\n[⏱] Processing folder...\n")
-            process_files(self.log_box)
-            self.log_box.insert(tk.END, "-" * 60 + "\n")
+        self.timer_var.set(f"👀 Watching folder ({self.watcher.mode})...")
+
+    def on_folder_change(self, files):
+        self.timer_var.set("🔄 Syncing now...")
+        self.log_box.insert(tk.END, f"\n[⏱] Change detected in {len(files)} file(s)...\n")
+        process_files(self.log_box, files)
+        self.log_box.insert(tk.END, "-" * 60 + "\n")
+        self.timer_var.set(f"👀 Watching folder ({self.watcher.mode})...")
+
+    def show_slowest_files(self):
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+            create_ingest_history_table(cursor)
+            conn.commit()
+            rows = slowest_files(cursor)
+            conn.close()
+        except Exception as e:
+            self.log_box.insert(tk.END, f"!! Error: {e}\n")
+            return
+
+        self.log_box.insert(tk.END, f"\n[🐢] Slowest {len(rows)} file ingest(s):\n")
+        for row in rows:
+            (file_name, table_name, started_at, total_s, read_s, clean_s, create_s, insert_s,
+             row_count, rows_per_sec, peak_mem_mb) = row
+            memory = f", memory +{peak_mem_mb:.0f} MB" if peak_mem_mb else ""
+            self.log_box.insert(tk.END, f"  {total_s:7.2f}s  {file_name} ➜ {table_name} ({started_at:%Y-%m-%d %H:%M}) "
+                                        f"read {read_s:.2f} / clean {clean_s:.2f} / create {create_s:.2f} / "
+                                        f"insert {insert_s:.2f}, {row_count:,} rows at {rows_per_sec:,.0f}/s{memory}\n")
+        self.log_box.see(tk.END)
 
     def stop_loop(self):
         self.running = False
+        if self.watcher:
+            self.watcher.stop()
         self.timer_var.set("⏹️ Sync paused.")
         self.log_box.insert(tk.END, "\n>> Stopped syncing.\n")
 
@@ -1,13 +1,25 @@
 """TK INTER IS INTEGRATED WHICH WILL EXTRACT THE FORMULA OF ANY TABLE OF EXCEL AND DELIVER IT TO THE TABLE AREA CALCULATION FORMULA TABLE"""
 """Extract Excel formulas and store them in SQL Server - Sperene Tools"""
 
+import argparse
+import csv
+import glob
+import hashlib
 import os
 import re
+import sys
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import openpyxl
+from openpyxl.worksheet.formula import DataTableFormula
 import pyodbc
 import traceback
+from functools import lru_cache
 
 # --- CONFIG ---
 DB_CONFIG = {
@@ -15,35 +27,462 @@ DB_CONFIG = {
     'database': 'test',
     'trusted_connection': 'yes'
 }
+SHEETS = None            # sheet names to extract; None = every worksheet
+DEFAULT_HEADER_ROW = 1   # row holding the column headers; formulas are read from the rows below it
+HEADER_ROWS = {}         # per-sheet override, e.g. {'Summary': 3}; 0 = no header row (column letters are used)
+STAGE_BATCH = 10000      # formulas per executemany into the staging table
+BATCH_WORKERS = os.cpu_count() or 2   # extraction processes in batch (command-line) mode
+BATCH_PATTERNS = ('*.xlsx', '*.xlsm')  # workbooks picked up from a folder in batch mode
+EXTRACTOR_VERSION = 3    # bump when extracted records change, so stored fingerprints stop matching
+
+# --- FORMULA TOKENIZER ---
+# One left-to-right pass: strings, structured refs and names are consumed whole, so a reference
+# is only ever recognised at a token boundary (LOG10( is a function, A1 inside A10 is never hit).
+FORMULA_TOKEN = re.compile(r"""
+    (?P<string>"(?:[^"]|"")*")
+  | (?P<ref>
+        (?P<sheet>(?:'(?:[^']|'')+'|\[\d+\][\w.]+|[A-Za-z_\\][\w.]*)(?::[A-Za-z_][\w.]*)?!)?
+        (?P<body>\$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?
+               | \$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+               | \$?\d+:\$?\d+)
+        (?![\w.(!\[])
+    )
+  | (?P<struct>(?:[A-Za-z_\\][\w.]*)?\[(?:[^\[\]]|\[[^\[\]]*\])*\])
+  | (?P<name>[A-Za-z_\\][\w.]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[Ee][+-]?\d+)?|\.\d+(?:[Ee][+-]?\d+)?)
+""", re.VERBOSE)
+REF_PART = re.compile(r"\$?([A-Za-z]{1,3})?\$?(\d+)?")
+REF_ANCHORS = re.compile(r"(\$?)([A-Za-z]{1,3})?(\$?)(\d+)?")
+MAX_COLUMN = 16384   # XFD
+MAX_ROW = 1048576
+
+@lru_cache(maxsize=None)
+def column_index(letters):
+    return openpyxl.utils.cell.column_index_from_string(letters.upper())
+
+def header_map(headers):
+    # 1-based column index -> header text, only for columns that have one
+    return {i: str(header) for i, header in enumerate(headers, start=1) if header not in (None, '')}
+
+def sheet_key(prefix):
+    # "'My Sheet'!" / "Sheet1!" -> sheet title; 3-D and external references have no single sheet
+    name = prefix[:-1]
+    if name.startswith("'"):
+        name = name[1:-1].replace("''", "'")
+    return None if ':' in name or name.startswith('[') else name
+
+def map_reference(body, columns):
+    # Returns the header form of a cell/range body, or None when any column lacks a header
+    names = []
+    for part in body.split(':'):
+        letters, row = REF_PART.fullmatch(part).groups()
+        if letters is None:
+            return None   # row range
+        index = column_index(letters)
+        if index > MAX_COLUMN or index not in columns:
+            return None
+        names.append(columns[index])
+    if len(names) == 2 and names[0] == names[1]:
+        return names[0]
+    return ':'.join(names)
+
+def replace_with_headers(formula, headers, sheet_headers=None):
+    """Rewrite cell references in formula with their column headers.
+
+    headers is the formula's own sheet (a header list or a header_map); sheet_headers maps
+    other sheet titles to header_maps for sheet-qualified references. A1 and $A$1 become the
+    header, a single-column range A2:A9 becomes the header once, and references without a
+    header (or with ambiguous 3-D/external sheets) are left untouched.
+    """
+    columns = headers if isinstance(headers, dict) else header_map(headers)
+    sheet_headers = sheet_headers or {}
+
+    def replace(match):
+        if match.lastgroup != 'ref':
+            return match.group(0)
+        prefix = match.group('sheet')
+        if prefix:
+            sheet_columns = sheet_headers.get(sheet_key(prefix))
+            mapped = map_reference(match.group('body'), sheet_columns) if sheet_columns else None
+            return prefix + mapped if mapped else match.group(0)
+        mapped = map_reference(match.group('body'), columns)
+        return mapped or match.group(0)
+
+    return FORMULA_TOKEN.sub(replace, formula)
+
+# --- SHARED FORMULAS ---
+# A formula filled down a column differs per cell in A1 notation (=B2*C2, =B3*C3, ...) but is the
+# same in relative R1C1 notation (=RC[-2]*RC[-1]), so runs of equal R1C1 text collapse into one
+# range record. Runs only go down a column: every cell of a run then references the same columns
+# and shares one header mapping.
+def split_part(part):
+    # "$B$2" -> (column abs, letters, row abs, digits); "$5" in "$5:$7" is an absolute row
+    col_abs, letters, row_abs, digits = REF_ANCHORS.fullmatch(part).groups()
+    if not letters:
+        col_abs, row_abs = '', row_abs or col_abs
+    return col_abs, letters, row_abs, digits
+
+def r1c1_part(part, row, column):
+    col_abs, letters, row_abs, digits = split_part(part)
+    text = ''
+    if digits:
+        number = int(digits)
+        text += f"R{number}" if row_abs else (f"R[{number - row}]" if number != row else "R")
+    if letters:
+        number = column_index(letters)
+        text += f"C{number}" if col_abs else (f"C[{number - column}]" if number != column else "C")
+    return text
+
+def to_r1c1(formula, row, column):
+    """Relative R1C1 form of a formula written in the cell at (row, column)."""
+    def replace(match):
+        if match.lastgroup != 'ref':
+            return match.group(0)
+        body = ':'.join(r1c1_part(part, row, column) for part in match.group('body').split(':'))
+        return (match.group('sheet') or '') + body
+    return FORMULA_TOKEN.sub(replace, formula)
+
+def shift_rows(formula, rows):
+    """The formula as it reads when filled rows further down (relative row references move)."""
+    def replace(match):
+        if match.lastgroup != 'ref':
+            return match.group(0)
+        parts = []
+        for part in match.group('body').split(':'):
+            col_abs, letters, row_abs, digits = split_part(part)
+            if digits and not row_abs:
+                digits = str(int(digits) + rows)
+            parts.append(f"{col_abs}{letters or ''}{row_abs}{digits or ''}")
+        return (match.group('sheet') or '') + ':'.join(parts)
+    return FORMULA_TOKEN.sub(replace, formula) if rows else formula
+
+def cell_range(record):
+    # "D2:D9" -> ("D", 2, 9); a single cell "D2" -> ("D", 2, 2)
+    first, _, last = record['CellName'].partition(':')
+    letters, first_row = openpyxl.utils.cell.coordinate_from_string(first)
+    last_row = openpyxl.utils.cell.coordinate_from_string(last)[1] if last else first_row
+    return letters, first_row, last_row
+
+def expand_formulas(records):
+    """Yield one per-cell record for every cell covered by the (range) records."""
+    for record in records:
+        letters, first_row, last_row = cell_range(record)
+        for row in range(first_row, last_row + 1):
+            yield dict(record, Formula=shift_rows(record['Formula'], row - first_row),
+                       CellName=f"{letters}{row}", Cells=1)
+
+# --- DEPENDENCY GRAPH ---
+# Nodes are (sheet, column letter). An edge runs from a column to the formula range that reads it
+# and keeps the rows read: absolute rows as numbers, relative rows as offsets from each formula
+# cell, which is the same for every cell of a run. That answers cell-level questions exactly.
+FormulaEdge = namedtuple('FormulaEdge', [
+    'Sheet_Name', 'Column_Name', 'Column_Header', 'First_Row', 'Last_Row',
+    'Precedent_Sheet', 'Precedent_Column', 'Precedent_Header', 'Lo_Row', 'Lo_Absolute', 'Hi_Row', 'Hi_Absolute'
+])
+
+def formula_references(formula, sheet, row, header_maps):
+    """(sheet, column, header, lo row, lo absolute, hi row, hi absolute) per column the formula reads.
+
+    Whole-row and 3-D/external references name no single column and are left out.
+    """
+    references = []
+    for match in FORMULA_TOKEN.finditer(formula):
+        if match.lastgroup != 'ref':
+            continue
+        prefix = match.group('sheet')
+        target = sheet_key(prefix) if prefix else sheet
+        ends = [split_part(part) for part in match.group('body').split(':')]
+        if target is None or not all(letters for _, letters, _, _ in ends):
+            continue
+        first, last = ends[0], ends[-1]
+        if first[3] is None:
+            rows = (1, True, MAX_ROW, True)   # whole columns, A:C
+        else:
+            rows = (int(first[3]) - (0 if first[2] else row), bool(first[2]),
+                    int(last[3]) - (0 if last[2] else row), bool(last[2]))
+        low, high = sorted(column_index(end[1]) for end in (first, last))
+        headers = header_maps.get(target, {})
+        for number in range(low, min(high, MAX_COLUMN) + 1):
+            references.append((target, openpyxl.utils.get_column_letter(number), headers.get(number), *rows))
+    return list(dict.fromkeys(references))
+
+def record_edges(record):
+    letters, first_row, last_row = cell_range(record)
+    for reference in record['Precedents']:
+        yield FormulaEdge(record['Sheet'], letters, record['Header'], first_row, last_row, *reference)
+
+def formula_edges(records):
+    for record in records:
+        yield from record_edges(record)
+
+def dependent_rows(edge, low, high):
+    # Rows of the edge's formula range that read any of rows low..high of the precedent column
+    start, end = edge.First_Row, edge.Last_Row
+    if edge.Lo_Absolute:
+        if edge.Lo_Row > high:
+            return None
+    else:
+        end = min(end, high - edge.Lo_Row)
+    if edge.Hi_Absolute:
+        if edge.Hi_Row < low:
+            return None
+    else:
+        start = max(start, low - edge.Hi_Row)
+    return (start, end) if start <= end else None
+
+def reads_itself(edge):
+    # A column reading itself is only circular when some cell's referenced rows include its own row
+    if (edge.Sheet_Name, edge.Column_Name) != (edge.Precedent_Sheet, edge.Precedent_Column):
+        return False
+    start, end = edge.First_Row, edge.Last_Row
+    if edge.Lo_Absolute:
+        start = max(start, edge.Lo_Row)
+    elif edge.Lo_Row > 0:
+        return False
+    if edge.Hi_Absolute:
+        end = min(end, edge.Hi_Row)
+    elif edge.Hi_Row < 0:
+        return False
+    return start <= end
+
+class FormulaGraph:
+    """Column-level dependency graph built from FormulaEdges, held in memory for instant queries."""
+
+    def __init__(self, edges):
+        self.precedents = {}   # node -> nodes it reads
+        self.dependents = {}   # node -> nodes reading it
+        self.readers = {}      # node -> edges reading it
+        self.headers = {}
+        self.self_cycles = set()
+        for edge in edges:
+            node, source = (edge.Sheet_Name, edge.Column_Name), (edge.Precedent_Sheet, edge.Precedent_Column)
+            self.headers.setdefault(node, edge.Column_Header)
+            self.headers.setdefault(source, edge.Precedent_Header)
+            self.precedents.setdefault(node, set()).add(source)
+            self.dependents.setdefault(source, set()).add(node)
+            self.readers.setdefault(source, []).append(edge)
+            if reads_itself(edge):
+                self.self_cycles.add(node)
+
+    def nodes(self):
+        return sorted(set(self.precedents) | set(self.dependents))
+
+    def label(self, node):
+        header = self.headers.get(node)
+        return f"{node[0]}!{node[1]}" + (f" ({header})" if header else "")
+
+    def walk(self, node, links):
+        seen, stack = set(), [node]
+        while stack:
+            for nxt in links.get(stack.pop(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        seen.discard(node)
+        return seen
+
+    def all_precedents(self, node):
+        """Every column the node depends on, directly or through other formulas."""
+        return self.walk(node, self.precedents)
+
+    def all_dependents(self, node):
+        """Every formula column affected when the node changes."""
+        return self.walk(node, self.dependents)
+
+    def dependent_cells(self, sheet, cell):
+        """Formula cells that read the cell directly, as (sheet, 'D5' or 'D5:D9')."""
+        letters, row = openpyxl.utils.cell.coordinate_from_string(cell)
+        found = []
+        for edge in self.readers.get((sheet, letters), ()):
+            rows = dependent_rows(edge, row, row)
+            if rows:
+                found.append((edge.Sheet_Name, f"{edge.Column_Name}{rows[0]}" +
+                              (f":{edge.Column_Name}{rows[1]}" if rows[1] != rows[0] else "")))
+        return found
+
+    def components(self):
+        # Tarjan's strongly connected components, iterative; emitted dependents-first
+        index, low, on_stack, stack, result = {}, {}, set(), [], []
+        counter = 0
+        for root in self.nodes():
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.dependents.get(root, ()))))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.dependents.get(child, ())))))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        result.append(sorted(component))
+        return result
+
+    def cycles(self):
+        """Groups of columns that depend on each other, and columns with cells reading themselves.
+
+        Columns reading each other are reported even when their cells do not form a loop.
+        """
+        return [component for component in self.components()
+                if len(component) > 1 or component[0] in self.self_cycles]
+
+    def calculation_order(self):
+        """Every column after the columns it reads; columns of a cycle are kept together."""
+        return [node for component in reversed(self.components()) for node in component]
 
 # --- UTILITIES ---
-def extract_formulas(file_path):
-    workbook = openpyxl.load_workbook(file_path, data_only=False)
-    sheet = workbook.active
-    formulas = []
-    headers = [cell.value for cell in next(sheet.iter_rows())]
-
-    for row in sheet.iter_rows(min_row=2):
-        for col_index, cell in enumerate(row):
-            if cell.data_type == 'f':
-                formula_info = {
-                    'Formula': cell.value,
-                    'Header': headers[col_index],
-                    'CellName': cell.coordinate,
-                    'InvolvedColumns': replace_with_headers(cell.value, headers)
-                }
-                formulas.append(formula_info)
-
-    workbook.close()
-    return formulas
-
-def replace_with_headers(formula, headers):
-    column_refs = re.findall(r'([A-Za-z]+)(\d+)', formula)
-    for col_ref, row in column_refs:
-        col_index = openpyxl.utils.cell.column_index_from_string(col_ref) - 1
-        if col_index < len(headers) and headers[col_index]:
-            formula = formula.replace(f"{col_ref}{row}", headers[col_index])
-    return formula
+def formula_text(value):
+    # Array formulas come back as objects carrying the formula in .text. What-If data tables
+    # have no formula text, only their input cells; they are written as Excel shows them,
+    # =TABLE(row input, column input)
+    if isinstance(value, DataTableFormula):
+        if flag(value.dt2D):
+            inputs = (value.r1, value.r2)
+        elif flag(value.dtr):
+            inputs = (value.r1, None)
+        else:
+            inputs = (None, value.r1)
+        return f"=TABLE({','.join(ref or '' for ref in inputs)})"
+    return getattr(value, 'text', value)
+
+def flag(value):
+    # Data table attributes are read from the XML as strings
+    return value in (True, '1', 'true')
+
+def read_header_maps(workbook, header_rows):
+    # Header rows of every sheet up front, so sheet-qualified references can be mapped too
+    maps = {}
+    for sheet in workbook.worksheets:
+        header_row = header_rows.get(sheet.title, DEFAULT_HEADER_ROW)
+        rows = sheet.iter_rows(min_row=header_row, max_row=header_row, values_only=True) if header_row else []
+        maps[sheet.title] = header_map(next(iter(rows), ()))
+    return maps
+
+def formula_record(sheet, run, columns, header_maps, involved):
+    letters = openpyxl.utils.get_column_letter(run['column'])
+    cell_name = f"{letters}{run['first']}"
+    if run['last'] != run['first']:
+        cell_name += f":{letters}{run['last']}"
+    key = (run['column'], run['R1C1'])
+    if key not in involved:
+        involved[key] = (replace_with_headers(run['formula'], columns, header_maps),
+                         formula_references(run['formula'], sheet, run['first'], header_maps))
+    mapped, precedents = involved[key]
+    return {
+        'Sheet': sheet,
+        'Formula': run['formula'],
+        'R1C1': run['R1C1'],
+        'Header': columns.get(run['column']),
+        'CellName': cell_name,
+        'Cells': run['last'] - run['first'] + 1,
+        'InvolvedColumns': mapped,
+        'Precedents': precedents
+    }
+
+def iter_formulas(file_path, sheets=None, header_rows=None):
+    """Yield a record per run of a shared formula, streaming the selected sheets in read-only mode.
+
+    Consecutive cells down a column with the same R1C1 formula become one record whose CellName
+    is a range such as D2:D100001 and whose Formula is the top cell's; expand_formulas gives
+    the per-cell records back.
+    """
+    sheets = sheets if sheets is not None else SHEETS
+    header_rows = HEADER_ROWS if header_rows is None else header_rows
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=False)
+    try:
+        header_maps = read_header_maps(workbook, header_rows)
+        for sheet in workbook.worksheets:
+            if sheets and sheet.title not in sheets:
+                continue
+            sheet.reset_dimensions()   # stored dimensions can be wrong; read until the real last row
+            header_row = header_rows.get(sheet.title, DEFAULT_HEADER_ROW)
+            columns = header_maps[sheet.title]
+            involved = {}   # (column, R1C1 formula) -> (mapped headers, references), once per distinct formula
+            runs = {}       # column -> open run
+            for row_number, row in enumerate(sheet.iter_rows(min_row=header_row + 1), start=header_row + 1):
+                for cell in row:
+                    if cell.data_type != 'f':
+                        continue
+                    formula = formula_text(cell.value)
+                    r1c1 = to_r1c1(formula, row_number, cell.column)
+                    run = runs.get(cell.column)
+                    if run and run['R1C1'] == r1c1:
+                        run['last'] = row_number
+                        continue
+                    if run:
+                        yield formula_record(sheet.title, run, columns, header_maps, involved)
+                    runs[cell.column] = {'column': cell.column, 'formula': formula, 'R1C1': r1c1,
+                                         'first': row_number, 'last': row_number}
+                # A run ends at the first row that does not continue it
+                for column in [column for column, run in runs.items() if run['last'] < row_number]:
+                    yield formula_record(sheet.title, runs.pop(column), columns, header_maps, involved)
+            for run in runs.values():
+                yield formula_record(sheet.title, run, columns, header_maps, involved)
+    finally:
+        workbook.close()
+
+def extract_formulas(file_path, sheets=None, header_rows=None):
+    return list(iter_formulas(file_path, sheets, header_rows))
+
+# --- FINGERPRINTS ---
+# A workbook fingerprint (file bytes + extraction settings) lets an unchanged file be skipped
+# without opening it; sheet fingerprints (the sheet's XML part + header rows) narrow a changed
+# file down to the sheets that need extracting again.
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def workbook_fingerprint(file_path, sheets, header_rows):
+    settings = repr((EXTRACTOR_VERSION, DEFAULT_HEADER_ROW, sorted(header_rows.items()), sorted(sheets or [])))
+    return hashlib.blake2b(f"{file_digest(file_path)}|{settings}".encode(), digest_size=32).hexdigest()
+
+def sheet_fingerprints(file_path, header_rows):
+    """{sheet title: fingerprint} for every worksheet, hashing the raw XML parts.
+
+    Every fingerprint includes the header rows of all sheets: headers usually live in the
+    shared strings, and sheet-qualified references are mapped with other sheets' headers.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=False)
+    try:
+        headers = repr(sorted(read_header_maps(workbook, header_rows).items()))
+        parts = {sheet.title: sheet._worksheet_path for sheet in workbook.worksheets}
+    finally:
+        workbook.close()
+    settings = f"{EXTRACTOR_VERSION}|{DEFAULT_HEADER_ROW}|{sorted(header_rows.items())}|{headers}".encode()
+    fingerprints = {}
+    with zipfile.ZipFile(file_path) as archive:
+        for title, part in parts.items():
+            digest = hashlib.blake2b(settings, digest_size=32)
+            with archive.open(part) as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            fingerprints[title] = digest.hexdigest()
+    return fingerprints
 
 def create_tracking_table_if_not_exists(cursor):
     cursor.execute('''
@@ -54,40 +493,274 @@ def create_tracking_table_if_not_exists(cursor):
                 Column_Header NVARCHAR(255),
                 CellName NVARCHAR(255),
                 Involved_Columns NVARCHAR(MAX),
-                Table_Name NVARCHAR(255)
+                Table_Name NVARCHAR(255),
+                Sheet_Name NVARCHAR(255),
+                Formula_R1C1 NVARCHAR(MAX),
+                Cell_Count INT
             );
         END
+        IF COL_LENGTH('areaCalculationSheet_Formulas', 'Sheet_Name') IS NULL
+        BEGIN
+            ALTER TABLE areaCalculationSheet_Formulas ADD Sheet_Name NVARCHAR(255);
+        END
+        IF COL_LENGTH('areaCalculationSheet_Formulas', 'Formula_R1C1') IS NULL
+        BEGIN
+            ALTER TABLE areaCalculationSheet_Formulas ADD Formula_R1C1 NVARCHAR(MAX), Cell_Count INT;
+        END
     ''')
+    cursor.execute('''
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='areaCalculationSheet_Formula_Edges')
+        BEGIN
+            CREATE TABLE areaCalculationSheet_Formula_Edges (
+                Table_Name NVARCHAR(255) NOT NULL,
+                Sheet_Name NVARCHAR(255) NOT NULL,
+                Column_Name NVARCHAR(3) NOT NULL,
+                Column_Header NVARCHAR(255),
+                First_Row INT NOT NULL,
+                Last_Row INT NOT NULL,
+                Precedent_Sheet NVARCHAR(255) NOT NULL,
+                Precedent_Column NVARCHAR(3) NOT NULL,
+                Precedent_Header NVARCHAR(255),
+                Lo_Row INT NOT NULL,
+                Lo_Absolute BIT NOT NULL,
+                Hi_Row INT NOT NULL,
+                Hi_Absolute BIT NOT NULL
+            );
+            CREATE CLUSTERED INDEX IX_areaCalculationSheet_Formula_Edges_Precedent
+                ON areaCalculationSheet_Formula_Edges (Table_Name, Precedent_Sheet, Precedent_Column);
+            CREATE INDEX IX_areaCalculationSheet_Formula_Edges_Dependent
+                ON areaCalculationSheet_Formula_Edges (Table_Name, Sheet_Name, Column_Name)
+                INCLUDE (Precedent_Sheet, Precedent_Column);
+        END
+    ''')
+    cursor.execute('''
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='areaCalculationSheet_Fingerprints')
+        BEGIN
+            CREATE TABLE areaCalculationSheet_Fingerprints (
+                Table_Name NVARCHAR(255) NOT NULL,
+                Sheet_Name NVARCHAR(255) NOT NULL,
+                Sheet_Hash CHAR(64) NOT NULL,
+                Workbook_Hash CHAR(64) NOT NULL,
+                Checked_At DATETIME2 NOT NULL,
+                CONSTRAINT PK_areaCalculationSheet_Fingerprints PRIMARY KEY (Table_Name, Sheet_Name)
+            );
+        END
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name='areaCalculationSheet_Formula_Changelog')
+        BEGIN
+            CREATE TABLE areaCalculationSheet_Formula_Changelog (
+                Changed_At DATETIME2 NOT NULL,   -- UTC
+                Table_Name NVARCHAR(255) NOT NULL,
+                Sheet_Name NVARCHAR(255) NOT NULL,
+                CellName NVARCHAR(255) NOT NULL,
+                Action NVARCHAR(10) NOT NULL,
+                Old_Formula NVARCHAR(MAX),
+                New_Formula NVARCHAR(MAX)
+            );
+            CREATE CLUSTERED INDEX IX_areaCalculationSheet_Formula_Changelog
+                ON areaCalculationSheet_Formula_Changelog (Table_Name, Changed_At);
+        END
+    ''')
+    # One row per cell range: the MERGE key, and what keeps each lookup a seek instead of a table scan
+    cursor.execute('''
+        IF NOT EXISTS (SELECT * FROM sys.indexes
+                       WHERE name = 'UX_areaCalculationSheet_Formulas_Cell'
+                         AND object_id = OBJECT_ID('areaCalculationSheet_Formulas'))
+        BEGIN
+            CREATE UNIQUE INDEX UX_areaCalculationSheet_Formulas_Cell
+                ON areaCalculationSheet_Formulas (Table_Name, Sheet_Name, CellName);
+        END
+    ''')
+
+def get_connection():
+    return pyodbc.connect(
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={DB_CONFIG['server']};"
+        f"DATABASE={DB_CONFIG['database']};"
+        f"Trusted_Connection={DB_CONFIG['trusted_connection']};"
+    )
+
+def stage_formulas(cursor, table_name, formulas):
+    # Loads an iterable of formula records into #formula_stage in STAGE_BATCH chunks; returns the count
+    cursor.execute('''
+        CREATE TABLE #formula_stage (
+            Formula NVARCHAR(MAX),
+            Column_Header NVARCHAR(255),
+            CellName NVARCHAR(255) NOT NULL,
+            Involved_Columns NVARCHAR(MAX),
+            Table_Name NVARCHAR(255) NOT NULL,
+            Sheet_Name NVARCHAR(255) NOT NULL,
+            Formula_R1C1 NVARCHAR(MAX),
+            Cell_Count INT
+        );
+    ''')
+    cursor.fast_executemany = True
+    rows = ([item['Formula'], None if item['Header'] is None else str(item['Header']), item['CellName'],
+             item['InvolvedColumns'], table_name, item['Sheet'], item['R1C1'], item['Cells']] for item in formulas)
+    staged = 0
+    while True:
+        batch = list(islice(rows, STAGE_BATCH))
+        if not batch:
+            break
+        cursor.executemany('''
+            INSERT INTO #formula_stage (Formula, Column_Header, CellName, Involved_Columns, Table_Name, Sheet_Name,
+                                        Formula_R1C1, Cell_Count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        staged += len(batch)
+    cursor.execute("CREATE UNIQUE CLUSTERED INDEX IX_formula_stage ON #formula_stage (Sheet_Name, CellName)")
+    return staged
+
+def merge_formulas(cursor, table_name, sheets=None):
+    """Apply #formula_stage to areaCalculationSheet_Formulas in one MERGE.
+
+    Changed cells are updated, new ones inserted, and stored cells of this workbook that were
+    not extracted again are deleted (only within sheets when a subset was extracted). Every
+    written row is logged to areaCalculationSheet_Formula_Changelog.
+    Returns {'INSERT': n, 'UPDATE': n, 'DELETE': n}.
+    """
+    # Rows stored before sheets were tracked came from the active sheet only; they are re-extracted with a sheet
+    cursor.execute("DELETE FROM areaCalculationSheet_Formulas WHERE Table_Name = ? AND Sheet_Name IS NULL", (table_name,))
+    # The target is narrowed to this workbook (and sheets) before the MERGE, so it seeks on the cell
+    # index and only range-locks this workbook's rows instead of scanning every workbook's
+    sheet_filter = f"AND Sheet_Name IN ({', '.join('?' * len(sheets))})" if sheets else ""
+    cursor.execute(f'''
+        SET NOCOUNT ON;
+        DECLARE @changes TABLE (Action NVARCHAR(10), Sheet_Name NVARCHAR(255), CellName NVARCHAR(255),
+                                Old_Formula NVARCHAR(MAX), New_Formula NVARCHAR(MAX));
+        WITH t AS (
+            SELECT * FROM areaCalculationSheet_Formulas WITH (HOLDLOCK)
+            WHERE Table_Name = ? {sheet_filter}
+        )
+        MERGE t
+        USING #formula_stage AS s
+           ON t.Sheet_Name = s.Sheet_Name AND t.CellName = s.CellName
+        WHEN MATCHED AND (t.Formula <> s.Formula
+                          OR ISNULL(t.Column_Header, N'') <> ISNULL(s.Column_Header, N'')
+                          OR ISNULL(t.Involved_Columns, N'') <> ISNULL(s.Involved_Columns, N'')
+                          OR ISNULL(t.Formula_R1C1, N'') <> s.Formula_R1C1
+                          OR ISNULL(t.Cell_Count, 0) <> s.Cell_Count) THEN
+            UPDATE SET Formula = s.Formula, Column_Header = s.Column_Header, Involved_Columns = s.Involved_Columns,
+                       Formula_R1C1 = s.Formula_R1C1, Cell_Count = s.Cell_Count
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT (Formula, Column_Header, CellName, Involved_Columns, Table_Name, Sheet_Name, Formula_R1C1, Cell_Count)
+            VALUES (s.Formula, s.Column_Header, s.CellName, s.Involved_Columns, s.Table_Name, s.Sheet_Name,
+                    s.Formula_R1C1, s.Cell_Count)
+        WHEN NOT MATCHED BY SOURCE THEN
+            DELETE
+        OUTPUT $action, ISNULL(inserted.Sheet_Name, deleted.Sheet_Name), ISNULL(inserted.CellName, deleted.CellName),
+               deleted.Formula, inserted.Formula INTO @changes;
+        INSERT INTO areaCalculationSheet_Formula_Changelog
+            (Changed_At, Table_Name, Sheet_Name, CellName, Action, Old_Formula, New_Formula)
+        SELECT SYSUTCDATETIME(), ?, Sheet_Name, CellName, Action, Old_Formula, New_Formula FROM @changes;
+        SELECT Action, COUNT(*) FROM @changes GROUP BY Action;
+    ''', [table_name, *(sheets or []), table_name])
+    counts = {'INSERT': 0, 'UPDATE': 0, 'DELETE': 0}
+    counts.update({action: count for action, count in cursor.fetchall()})
+    cursor.execute("DROP TABLE #formula_stage")
+    return counts
+
+def replace_edges(cursor, table_name, edges, sheets=None):
+    # Edges are derived from the formulas, so the workbook's (or the extracted sheets') edges are rewritten
+    sheet_filter = f"AND Sheet_Name IN ({', '.join('?' * len(sheets))})" if sheets else ""
+    cursor.execute(f"DELETE FROM areaCalculationSheet_Formula_Edges WHERE Table_Name = ? {sheet_filter}",
+                   [table_name, *(sheets or [])])
+    cursor.fast_executemany = True
+    rows = ([table_name, *edge] for edge in edges)
+    while True:
+        batch = list(islice(rows, STAGE_BATCH))
+        if not batch:
+            break
+        cursor.executemany(f"INSERT INTO areaCalculationSheet_Formula_Edges (Table_Name, {', '.join(FormulaEdge._fields)}) "
+                           f"VALUES ({', '.join('?' * (len(FormulaEdge._fields) + 1))})", batch)
+
+def load_graph(cursor, table_name):
+    """FormulaGraph of a stored workbook, read through the edge table's index."""
+    cursor.execute(f"SELECT {', '.join(FormulaEdge._fields)} FROM areaCalculationSheet_Formula_Edges "
+                   f"WHERE Table_Name = ?", (table_name,))
+    return FormulaGraph(FormulaEdge(*row) for row in cursor.fetchall())
+
+def stored_fingerprints(cursor, table_name=None):
+    # {sheet: (sheet hash, workbook hash)} of one workbook, or {table: {...}} of all when table_name is None
+    if table_name is not None:
+        return stored_fingerprints_where(cursor, "WHERE Table_Name = ?", (table_name,)).get(table_name, {})
+    return stored_fingerprints_where(cursor, "", ())
+
+def stored_fingerprints_where(cursor, where, params):
+    cursor.execute(f"SELECT Table_Name, Sheet_Name, Sheet_Hash, Workbook_Hash FROM areaCalculationSheet_Fingerprints {where}",
+                   params)
+    stored = {}
+    for table, sheet, sheet_hash, workbook_hash in cursor.fetchall():
+        stored.setdefault(table, {})[sheet] = (sheet_hash, workbook_hash)
+    return stored
+
+def save_fingerprints(cursor, table_name, fingerprints, workbook_hash, removed):
+    names = list(fingerprints) + list(removed)
+    if names:
+        cursor.execute(f"DELETE FROM areaCalculationSheet_Fingerprints WHERE Table_Name = ? "
+                       f"AND Sheet_Name IN ({', '.join('?' * len(names))})", [table_name, *names])
+    if fingerprints:
+        cursor.executemany("INSERT INTO areaCalculationSheet_Fingerprints "
+                           "(Table_Name, Sheet_Name, Sheet_Hash, Workbook_Hash, Checked_At) VALUES (?, ?, ?, ?, SYSUTCDATETIME())",
+                           [[table_name, sheet, sheet_hash, workbook_hash] for sheet, sheet_hash in fingerprints.items()])
+
+def plan_sync(file_path, table_name, stored, sheets=None, header_rows=None):
+    """Work out what a workbook needs written, without touching the DB.
 
-def update_or_insert(cursor, table_name, formulas):
-    for item in formulas:
-        cursor.execute('''
-            IF EXISTS (SELECT * FROM areaCalculationSheet_Formulas WHERE CellName = ? AND Table_Name = ?)
-            BEGIN
-                UPDATE areaCalculationSheet_Formulas
-                SET Formula = ?, Column_Header = ?, Involved_Columns = ?
-                WHERE CellName = ? AND Table_Name = ?
-            END
-            ELSE
-            BEGIN
-                INSERT INTO areaCalculationSheet_Formulas (Formula, Column_Header, CellName, Involved_Columns, Table_Name)
-                VALUES (?, ?, ?, ?, ?)
-            END
-        ''', (
-            item['CellName'], table_name,
-            item['Formula'], item['Header'], item['InvolvedColumns'],
-            item['CellName'], table_name,
-            item['Formula'], item['Header'], item['CellName'], item['InvolvedColumns'], table_name
-        ))
-
-def store_to_db(formulas, table_name):
-    conn_str = f"DRIVER={{SQL Server}};SERVER={DB_CONFIG['server']};DATABASE={DB_CONFIG['database']};Trusted_Connection={DB_CONFIG['trusted_connection']}"
-    conn = pyodbc.connect(conn_str)
-    cursor = conn.cursor()
-    create_tracking_table_if_not_exists(cursor)
-    update_or_insert(cursor, table_name, formulas)
-    conn.commit()
-    conn.close()
+    stored is the workbook's stored_fingerprints. An unchanged file is recognised on its
+    workbook fingerprint alone; otherwise only sheets whose fingerprint changed are extracted.
+    Returns a plain (picklable) dict, so batch mode can run this in worker processes.
+    """
+    started = time.perf_counter()
+    sheets = sheets if sheets is not None else SHEETS
+    header_rows = HEADER_ROWS if header_rows is None else header_rows
+    plan = {'File': file_path, 'Table': table_name, 'INSERT': 0, 'UPDATE': 0, 'DELETE': 0, 'Sheets': 0,
+            'Changed': [], 'Removed': [], 'Formulas': 0, 'Cells': 0, 'Unchanged': False,
+            'Records': [], 'Edges': [], 'Fingerprints': {},
+            'Workbook_Hash': workbook_fingerprint(file_path, sheets, header_rows)}
+    selected = {sheet: value for sheet, value in stored.items() if not sheets or sheet in sheets}
+    if selected and all(value[1] == plan['Workbook_Hash'] for value in selected.values()):
+        plan.update(Sheets=len(selected), Unchanged=True, Seconds=time.perf_counter() - started)
+        return plan
+
+    fingerprints = {sheet: fingerprint for sheet, fingerprint in sheet_fingerprints(file_path, header_rows).items()
+                    if not sheets or sheet in sheets}
+    changed = [sheet for sheet, fingerprint in fingerprints.items() if selected.get(sheet, (None,))[0] != fingerprint]
+    records = list(iter_formulas(file_path, changed, header_rows)) if changed else []
+    plan.update(Sheets=len(fingerprints), Changed=changed, Removed=[sheet for sheet in selected if sheet not in fingerprints],
+                Fingerprints=fingerprints, Records=records, Edges=list(formula_edges(records)),
+                Formulas=len(records), Cells=sum(record['Cells'] for record in records),
+                Seconds=time.perf_counter() - started)
+    return plan
+
+def write_sync(cursor, plan):
+    # Merges the changed sheets, rewrites their edges and saves the fingerprints; the caller commits
+    if plan['Unchanged']:
+        return plan
+    touched = plan['Changed'] + plan['Removed']
+    if touched:
+        stage_formulas(cursor, plan['Table'], plan['Records'])
+        plan.update(merge_formulas(cursor, plan['Table'], touched))
+        replace_edges(cursor, plan['Table'], plan['Edges'], touched)
+    save_fingerprints(cursor, plan['Table'], plan['Fingerprints'], plan['Workbook_Hash'], plan['Removed'])
+    return plan
+
+def sync_workbook(file_path, table_name, sheets=None, header_rows=None):
+    """Bring the stored formulas of a workbook up to date, extracting only what changed.
+
+    Formulas of sheets that no longer exist are removed. Returns the plan_sync summary,
+    with the workbook's stored FormulaGraph under 'Graph'.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        create_tracking_table_if_not_exists(cursor)
+        plan = plan_sync(file_path, table_name, stored_fingerprints(cursor, table_name), sheets, header_rows)
+        write_sync(cursor, plan)
+        conn.commit()
+        plan['Graph'] = load_graph(cursor, table_name)
+        return plan
+    finally:
+        conn.close()
 
 # --- GUI LOGIC ---
 def process_excel_file():
@@ -101,21 +774,76 @@ def process_excel_file():
     selected_file_var.set(f"📄 Selected File: {os.path.basename(file_path)}")
 
     try:
-        formulas = extract_formulas(file_path)
-        if formulas:
-            store_to_db(formulas, file_name)
-            msg = f"✅ '{file_name}' processed.\n📊 {len(formulas)} formula(s) stored to DB."
-            status_var.set(msg)
-            messagebox.showinfo("Success", msg)
+        global formula_graph
+        started = time.perf_counter()
+        summary = sync_workbook(file_path, file_name)
+        formula_graph = summary['Graph']
+        elapsed = time.perf_counter() - started
+        if summary['Unchanged']:
+            msg = f"✅ '{file_name}' is unchanged since its last audit ({summary['Sheets']} sheet(s), {elapsed:.2f}s)."
         else:
-            status_var.set("ℹ️ No formulas found in the Excel file.")
-            messagebox.showinfo("Info", "No formulas were found in the selected file.")
+            changes = f"➕ {summary['INSERT']} added, ✏️ {summary['UPDATE']} changed, 🗑️ {summary['DELETE']} removed."
+            msg = (f"✅ '{file_name}' processed in {elapsed:.2f}s.\n"
+                   f"📊 {len(summary['Changed'])} of {summary['Sheets']} sheet(s) changed; {summary['Cells']} formula cell(s) "
+                   f"re-extracted as {summary['Formulas']} formula range(s).\n{changes}")
+        status_var.set(msg)
+        messagebox.showinfo("Success", msg)
     except Exception as e:
         error_msg = f"❌ Error: {e}"
         status_var.set(error_msg)
         traceback.print_exc()
         messagebox.showerror("Error", f"An error occurred:\n{e}")
 
+formula_graph = None
+
+def show_dependencies():
+    if not formula_graph or not formula_graph.nodes():
+        messagebox.showinfo("Dependencies", "Process an Excel file with formulas first.")
+        return
+    graph = formula_graph
+    nodes = graph.nodes()
+    labels = [graph.label(node) for node in nodes]
+
+    window = tk.Toplevel()
+    window.title("Formula Dependencies - Sperene Tools")
+    window.geometry("620x520")
+    window.config(bg="#f0f8ff")
+
+    top = tk.Frame(window, bg="#f0f8ff", pady=10)
+    top.pack(fill=tk.X, padx=15)
+    tk.Label(top, text="Column:", bg="#f0f8ff", font=("Arial", 10)).pack(side=tk.LEFT)
+    choice = ttk.Combobox(top, values=labels, state="readonly", width=45)
+    choice.pack(side=tk.LEFT, padx=8)
+    choice.current(0)
+
+    buttons = tk.Frame(window, bg="#f0f8ff")
+    buttons.pack(fill=tk.X, padx=15)
+    results = tk.Listbox(window, font=("Consolas", 10))
+    results.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+    info_var = tk.StringVar()
+    tk.Label(window, textvariable=info_var, anchor="w", bg="#d3eaff", font=("Arial", 10)).pack(fill=tk.X, ipady=4)
+
+    def show(title, query):
+        started = time.perf_counter()
+        found = query()
+        elapsed = (time.perf_counter() - started) * 1000
+        results.delete(0, tk.END)
+        for line in found:
+            results.insert(tk.END, line)
+        info_var.set(f"{title}: {len(found)} in {elapsed:.1f} ms")
+
+    def selected():
+        return nodes[choice.current()]
+
+    ttk.Button(buttons, text="⬅ Precedents", command=lambda: show(
+        "Precedents", lambda: sorted(map(graph.label, graph.all_precedents(selected()))))).pack(side=tk.LEFT, padx=4)
+    ttk.Button(buttons, text="Dependents ➡", command=lambda: show(
+        "Dependents", lambda: sorted(map(graph.label, graph.all_dependents(selected()))))).pack(side=tk.LEFT, padx=4)
+    ttk.Button(buttons, text="🔁 Cycles", command=lambda: show(
+        "Cycles", lambda: [" → ".join(map(graph.label, cycle)) for cycle in graph.cycles()])).pack(side=tk.LEFT, padx=4)
+    ttk.Button(buttons, text="🔢 Calculation Order", command=lambda: show(
+        "Columns", lambda: [graph.label(node) for node in graph.calculation_order()])).pack(side=tk.LEFT, padx=4)
+
 # --- GUI DESIGN ---
 def launch_gui():
     global status_var, selected_file_var
@@ -139,6 +867,7 @@ def launch_gui():
 
     # Browse Button
     ttk.Button(root, text="📂 Browse Excel File", command=process_excel_file).pack(pady=12, ipadx=14, ipady=7)
+    ttk.Button(root, text="🔗 Dependencies", command=show_dependencies).pack(ipadx=14, ipady=4)
 
     # Selected File Label
     selected_file_var = tk.StringVar()
@@ -160,8 +889,10 @@ def launch_gui():
     features = [
         "✔️ Extract formulas used in Excel sheets",
         "✔️ See which columns the formulas refer to",
+        "✔️ Trace precedents, dependents and circular references",
         "✔️ Automatically stores data into SQL Server",
-        "✔️ No data lost — auto-update if formula changes"
+        "✔️ No data lost — auto-update if formula changes",
+        "✔️ Unchanged sheets are skipped; every change is logged"
     ]
     for feat in features:
         tk.Label(info_frame, text=feat, font=("Arial", 10), bg="#f0f8ff", anchor="w").pack(anchor="w")
@@ -179,8 +910,117 @@ def launch_gui():
 
     root.mainloop()
 
+# --- BATCH MODE ---
+REPORT_FIELDS = ['File', 'Table', 'Status', 'Sheets', 'Changed_Sheets', 'Formulas', 'Cells',
+                 'Added', 'Updated', 'Removed', 'Seconds', 'Error']
+
+def find_workbooks(paths):
+    # Folders contribute their BATCH_PATTERNS files; anything else is a glob (** allowed)
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = [match for pattern in BATCH_PATTERNS for match in glob.glob(os.path.join(path, pattern))]
+        else:
+            matches = glob.glob(path, recursive=True)
+        found.extend(os.path.abspath(match) for match in matches
+                     if os.path.isfile(match) and not os.path.basename(match).startswith('~$'))
+    return sorted(set(found))
+
+def report_row(path, table_name, plan=None, error=None):
+    if error is not None:
+        return {**dict.fromkeys(REPORT_FIELDS, ''), 'File': path, 'Table': table_name, 'Status': 'failed', 'Error': str(error)}
+    return {
+        'File': path, 'Table': table_name,
+        'Status': 'unchanged' if plan['Unchanged'] else 'updated',
+        'Sheets': plan['Sheets'], 'Changed_Sheets': ';'.join(plan['Changed'] + plan['Removed']),
+        'Formulas': plan['Formulas'], 'Cells': plan['Cells'],
+        'Added': plan['INSERT'], 'Updated': plan['UPDATE'], 'Removed': plan['DELETE'],
+        'Seconds': f"{plan['Seconds']:.2f}", 'Error': ''
+    }
+
+def run_batch(files, workers=BATCH_WORKERS, sheets=None):
+    """Sync every workbook: extraction runs in a process pool, all DB writes go through this process.
+
+    Each workbook is committed on its own, so one failure does not undo the others.
+    Returns a report_row per file.
+    """
+    report, tables = [], {}
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        create_tracking_table_if_not_exists(cursor)
+        conn.commit()
+        stored = stored_fingerprints(cursor)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for path in files:
+                table_name = os.path.splitext(os.path.basename(path))[0]
+                if table_name in tables:
+                    report.append(report_row(path, table_name, error=f"same table name as {tables[table_name]}"))
+                    continue
+                tables[table_name] = path
+                futures[pool.submit(plan_sync, path, table_name, stored.get(table_name, {}), sheets)] = (path, table_name)
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                path, table_name = futures[future]
+                try:
+                    plan = write_sync(cursor, future.result())
+                    conn.commit()
+                    report.append(report_row(path, table_name, plan))
+                except Exception as e:
+                    conn.rollback()
+                    report.append(report_row(path, table_name, error=e))
+                row = report[-1]
+                print(f"[{done}/{len(futures)}] {row['Status']:<9} {os.path.basename(path)} {row['Error']}".rstrip())
+    finally:
+        conn.close()
+    return report
+
+def report_totals(report, elapsed):
+    # Last row of the CSV: file count and status counts, summed counters and the wall time of the run
+    statuses = [row['Status'] for row in report]
+    totals = {**dict.fromkeys(REPORT_FIELDS, ''), 'File': 'TOTAL', 'Table': f"{len(report)} file(s)",
+              'Status': f"{statuses.count('updated')} updated, {statuses.count('unchanged')} unchanged, "
+                        f"{statuses.count('failed')} failed",
+              'Seconds': f"{elapsed:.2f}"}
+    for field in ('Formulas', 'Cells', 'Added', 'Updated', 'Removed'):
+        totals[field] = sum(row[field] for row in report if row[field] != '')
+    return totals
+
+def write_report(path, report, elapsed):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(report)
+        writer.writerow(report_totals(report, elapsed))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract formulas from many workbooks into SQL Server without the GUI")
+    parser.add_argument("paths", nargs="+", help="workbook folders and/or glob patterns, e.g. archive/**/*.xlsx")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="extraction processes")
+    parser.add_argument("--sheets", help="comma-separated sheet names to extract (default: every sheet)")
+    parser.add_argument("--report", default="formula_audit_report.csv", help="CSV summary report")
+    args = parser.parse_args(argv)
+
+    files = find_workbooks(args.paths)
+    if not files:
+        print("No workbooks found.")
+        return 1
+    started = time.perf_counter()
+    report = run_batch(files, args.workers, args.sheets.split(',') if args.sheets else None)
+    elapsed = time.perf_counter() - started
+    write_report(args.report, report, elapsed)
+
+    statuses = [row['Status'] for row in report]
+    print(f"\n{len(report)} workbook(s) in {elapsed:.1f}s ({len(report) / elapsed:.1f}/s): "
+          f"{report_totals(report, elapsed)['Status']}")
+    print(f"Report saved to {args.report}")
+    return 1 if 'failed' in statuses else 0
+
 # --- SAFELY LAUNCH ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
     try:
         launch_gui()
     except Exception as e:
@@ -0,0 +1,285 @@
+"""Benchmark ingest and formula extraction against synthetic files and a fake SQL Server connection"""
+import argparse
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import openpyxl
+
+# --- CONFIG ---
+SIZES = {
+    # shape -> (rows, columns) per size preset
+    'small': {'wide': (1000, 100), 'tall': (20000, 6), 'mixed': (5000, 12), 'formulas': (2000, 8)},
+    'medium': {'wide': (10000, 150), 'tall': (200000, 6), 'mixed': (50000, 12), 'formulas': (20000, 8)},
+    'large': {'wide': (50000, 200), 'tall': (2000000, 6), 'mixed': (500000, 12), 'formulas': (100000, 8)},
+}
+SHAPES = ('wide', 'tall', 'mixed', 'formulas')
+FORMATS = ('csv', 'xlsx')
+TARGET_MODULES = {
+    'process_files': 'Folder_to_Database',
+    'extract_formulas': 'Table_area',
+    'highlight_formula_cells': 'validation_check_excel',
+}
+REGRESSION_TOLERANCE = 0.2   # 20% slower / bigger than the baseline counts as a regression
+SEED = 42
+
+# --- Synthetic Data ---
+def mixed_value(col, row, rng):
+    kind = col % 6
+    if kind == 0:
+        return row
+    if kind == 1:
+        return f"{rng.uniform(-1000, 1000):.2f}"
+    if kind == 2:
+        return (datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(2000))).isoformat()
+    if kind == 3:
+        return rng.choice(("yes", "no"))
+    if kind == 4:
+        return rng.choice(("alpha", "beta", "gamma", "delta")) + str(rng.randrange(1000))
+    return "" if rng.random() < 0.1 else rng.randrange(10 ** 6)
+
+def synthetic_rows(shape, rows, cols, seed=SEED):
+    rng = random.Random(seed)
+    yield [f"Col_{c + 1}" for c in range(cols)]
+    for r in range(rows):
+        excel_row = r + 2
+        if shape == 'mixed':
+            yield [mixed_value(c, r, rng) for c in range(cols)]
+        elif shape == 'formulas':
+            # Two input columns, the rest are formulas over the same row
+            values = [r, round(rng.uniform(0, 100), 2)]
+            values += [f"=A{excel_row}*B{excel_row}+{c}" if c % 2 else f"=SUM(A{excel_row}:B{excel_row})"
+                       for c in range(2, cols)]
+            yield values
+        else:
+            yield [r] + [round(rng.uniform(0, 1000), 3) for _ in range(cols - 1)]
+
+def generate_file(folder, shape, fmt, rows, cols):
+    path = os.path.join(folder, f"bench_{shape}_{rows}x{cols}.{fmt}")
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(synthetic_rows(shape, rows, cols))
+    else:
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        for row in synthetic_rows(shape, rows, cols):
+            sheet.append(row)
+        workbook.save(path)
+    return path
+
+# --- Fake SQL Server Connection ---
+class FakeCursor:
+    """Records the statements an ingest would send; queries return no rows."""
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.fast_executemany = False
+
+    def record(self, sql, rows):
+        verb = sql.split(None, 1)[0].upper() if sql.strip() else "?"
+        entry = self.calls.setdefault(verb, {'statements': 0, 'rows': 0})
+        entry['statements'] += 1
+        entry['rows'] += rows
+
+    def execute(self, sql, params=None):
+        self.record(sql, self.rows_sent(sql, params))
+        return self
+
+    @staticmethod
+    def rows_sent(sql, params):
+        # A single statement only carries rows as a table-valued parameter ([type, schema, *rows])
+        # or as the file a BULK INSERT reads; everything else counts as 0 rows
+        for param in params or ():
+            if isinstance(param, list):
+                return len(param) - 2
+        match = re.search(r"BULK INSERT .*? FROM '([^']+)'", sql)
+        if match:
+            with open(match.group(1), encoding='utf-8') as f:
+                return sum(1 for _ in f)
+        return 0
+
+    def executemany(self, sql, rows):
+        self.record(sql, len(rows))
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size=1):
+        return []
+
+class FakeConnection:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def cursor(self):
+        return FakeCursor(self.calls)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+class LogSink:
+    def __init__(self):
+        self.lines = []
+
+    def insert(self, index, text):
+        self.lines.append(text)
+
+# --- Measurement ---
+def run_target(target, path, folder):
+    # Returns (rows or formula cells handled, fake DB calls)
+    calls = {}
+    if target == 'process_files':
+        import Folder_to_Database
+        Folder_to_Database.FOLDER_PATH = folder
+        Folder_to_Database.PARALLEL_INGEST = False
+        # Every case uses a fresh folder, so the parse cache would only add writes (to the user's real cache)
+        Folder_to_Database.PARSE_CACHE_ENABLED = False
+        Folder_to_Database.get_connection = lambda: FakeConnection(calls)
+        log = LogSink()
+        Folder_to_Database.process_files(log)
+        errors = [line for line in log.lines if line.startswith(("[✗]", "!!"))]
+        if errors:
+            raise RuntimeError("".join(errors).strip())
+        inserted = sum(entry['rows'] for verb, entry in calls.items() if verb in ("INSERT", "BULK"))
+        return inserted, calls
+    if target == 'extract_formulas':
+        import Table_area
+        records = Table_area.extract_formulas(path)
+        return sum(record['Cells'] for record in records), calls
+    if target == 'highlight_formula_cells':
+        import validation_check_excel
+        status = validation_check_excel.highlight_formula_cells(path, open_after=False)
+        if status.startswith("❌"):
+            raise RuntimeError(status)
+        return int(status.split()[1]), calls
+    raise ValueError(f"Unknown target {target}")
+
+def run_case(case_and_path):
+    # Runs in a fresh process so peak RSS belongs to this case only; the input file was
+    # generated by the parent, so building it is not part of the peak
+    case, path = case_and_path
+    result = dict(case, file_bytes=os.path.getsize(path))
+    from Folder_to_Database import peak_memory_mb
+    __import__(TARGET_MODULES[case['target']])   # keep import time out of the measurement
+    started = time.perf_counter()
+    try:
+        handled, calls = run_target(case['target'], path, os.path.dirname(path))
+        result['error'] = None
+    except Exception as e:
+        handled, calls = 0, {}
+        result['error'] = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    result.update(wall_s=round(wall, 4), items=handled,
+                  rows_per_sec=round(handled / wall, 1) if wall else None,
+                  peak_rss_mb=peak_memory_mb(), db_calls=calls)
+    return result
+
+def build_cases(size, shapes, formats, targets):
+    cases = []
+    for shape in shapes:
+        rows, cols = SIZES[size][shape]
+        for fmt in formats:
+            if shape == 'formulas' and fmt == 'csv':
+                continue
+            for target in targets:
+                if target != 'process_files' and fmt != 'xlsx':
+                    continue
+                cases.append({'case': f"{target}:{shape}.{fmt}", 'target': target, 'shape': shape,
+                              'format': fmt, 'rows': rows, 'cols': cols})
+    return cases
+
+def run_benchmarks(cases):
+    # Each shape/format file is generated once, alone in its own folder (process_files ingests a whole folder)
+    root = tempfile.mkdtemp(prefix="sperene_bench_")
+    try:
+        paths = {}
+        for case in cases:
+            key = (case['shape'], case['format'])
+            if key not in paths:
+                folder = os.path.join(root, f"{case['shape']}_{case['format']}")
+                os.makedirs(folder)
+                paths[key] = generate_file(folder, *key, case['rows'], case['cols'])
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes=1, maxtasksperchild=1) as pool:
+            return pool.map(run_case, [(case, paths[case['shape'], case['format']]) for case in cases], chunksize=1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+# --- Comparison ---
+def compare_runs(baseline, current, tolerance=REGRESSION_TOLERANCE):
+    previous = {result['case']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(result['case'])
+        if not old or old.get('error') or result.get('error'):
+            continue
+        for metric in ('wall_s', 'peak_rss_mb'):
+            if old.get(metric) and result.get(metric) and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{result['case']}: {metric} {old[metric]:.2f} -> {result[metric]:.2f}")
+    return regressions
+
+def print_results(results):
+    print(f"{'case':<42}{'items':>10}{'wall s':>10}{'items/s':>12}{'peak MB':>10}")
+    for result in results:
+        if result['error']:
+            print(f"{result['case']:<42}  ERROR {result['error']}")
+            continue
+        peak = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] else "-"
+        print(f"{result['case']:<42}{result['items']:>10}{result['wall_s']:>10.2f}"
+              f"{result['rows_per_sec']:>12,.0f}{peak:>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sperene ingest / extraction benchmark")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--targets", default="process_files,extract_formulas,highlight_formula_cells")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="previous JSON run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.size, args.shapes.split(","), args.formats.split(","), args.targets.split(","))
+    results = run_benchmarks(cases)
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec="seconds"),
+        'size': args.size,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+
+    print_results(results)
+    print(f"\nSaved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare_runs(json.load(f), run, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            return 1
+    return 1 if any(result['error'] for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import openpyxl
+from openpyxl.worksheet.formula import DataTableFormula
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Table_area
+
+
+def test_data_table_formulas_are_extracted(tmp_path):
+    path = str(tmp_path / "what_if.xlsx")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Rate", "Payment", "Grid"])
+    sheet["A2"] = 0.05
+    sheet["B2"] = "=A2*100"
+    sheet["B3"] = DataTableFormula(ref="B3:B5", r1="A2")
+    sheet["C3"] = DataTableFormula(ref="C3:D5", dt2D="1", r1="A2", r2="B2")
+    workbook.save(path)
+
+    records = {record['CellName']: record for record in Table_area.extract_formulas(path)}
+
+    assert records['B2']['Formula'] == "=A2*100"
+    assert records['B3']['Formula'] == "=TABLE(,A2)"
+    assert records['C3']['Formula'] == "=TABLE(A2,B2)"
+    assert records['C3']['InvolvedColumns'] == "=TABLE(Rate,Payment)"
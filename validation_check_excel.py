@@ -7,7 +7,7 @@ import os
 import subprocess
 
 # ------------------- Highlight Logic -------------------
-def highlight_formula_cells(file_path):
+def highlight_formula_cells(file_path, open_after=True):
     try:
         wb = openpyxl.load_workbook(file_path)
         sheet = wb.active
@@ -23,10 +23,11 @@ def highlight_formula_cells(file_path):
         wb.save(file_path)
 
         # Automatically open the file
-        try:
-            os.startfile(file_path)  # Windows only
-        except Exception as e:
-            subprocess.Popen(['open', file_path])  # Mac/Linux fallback
+        if open_after:
+            try:
+                os.startfile(file_path)  # Windows only
+            except Exception as e:
+                subprocess.Popen(['open', file_path])  # Mac/Linux fallback
 
         return f"✅ {formula_count} formula cell(s) highlighted successfully!"
     except Exception as e: